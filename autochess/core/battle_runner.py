@@ -0,0 +1,176 @@
+"""Headless Monte Carlo battle runner.
+
+Plays N fights between two lineups across a process pool and reports win rates,
+fight length and survivors with 95% confidence intervals. Fights are deterministic
+given their start positions; variation comes from jittering every unit's start
+position with a per-fight RNG derived from --seed and the fight index, so results
+are reproducible regardless of the number of workers.
+
+Lineup items are ``name@r,c`` (hex row/column on the board), ``name@x:y`` (pixel
+center) or a path to a JSON file holding a list of build_lineup specs.
+
+Example:
+    python -m autochess.core.battle_runner --blue warrior@2,1 archer@3,0 \\
+        --red lancer@2,7 monk@3,8 --wave 3 -n 2000
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from autochess.game.combat import MAX_TICKS, build_lineup, simulate, wave_extras
+from config.setting import TICK_RATE
+
+TEAMS = ('blue', 'red')
+
+# z-score for two-sided 95% confidence intervals
+Z_95 = 1.96
+
+# lineup shared by the fights of one worker process (set by _init_worker)
+_worker_lineup = None
+_worker_options = None
+
+
+def parse_lineup(items, team):
+    """Turn command-line lineup items into build_lineup specs for one team."""
+    specs = []
+    for item in items:
+        if item.endswith('.json'):
+            with open(item, encoding='utf-8') as f:
+                for spec in json.load(f):
+                    specs.append(dict(spec, team=team))
+            continue
+        name, sep, where = item.partition('@')
+        if not sep:
+            raise ValueError(f'lineup item {item!r} should look like name@r,c or name@x:y')
+        if ':' in where:
+            x, y = where.split(':')
+            specs.append({'name': name, 'team': team, 'pos': (int(x), int(y))})
+        else:
+            r, c = where.split(',')
+            specs.append({'name': name, 'team': team, 'hex': (int(r), int(c))})
+    return specs
+
+
+def jittered_lineup(lineup, jitter, rng):
+    """Lineup with every unit start position moved by up to `jitter` pixels on each axis."""
+    specs = []
+    for unit in build_lineup(lineup):
+        x = unit.cx + rng.uniform(-jitter, jitter)
+        y = unit.cy + rng.uniform(-jitter, jitter)
+        specs.append({'name': unit.name, 'team': unit.team, 'pos': (round(x), round(y))})
+    return specs
+
+
+def _init_worker(lineup, options):
+    global _worker_lineup, _worker_options
+    _worker_lineup = lineup
+    _worker_options = options
+
+
+def run_fight(index):
+    """Play fight number `index`; returns (winner, ticks, survivors per team)."""
+    jitter, seed, max_ticks, backend = _worker_options
+    rng = random.Random(f'{seed}-{index}')
+    lineup = jittered_lineup(_worker_lineup, jitter, rng) if jitter else _worker_lineup
+    result = simulate(lineup, max_ticks, backend=backend)
+    return result['winner'], result['ticks'], tuple(result['survivors'].get(team, 0) for team in TEAMS)
+
+
+def run_batch(lineup, fights, jitter=8, seed=0, max_ticks=MAX_TICKS, backend='python', workers=None):
+    """Play `fights` fights across a process pool; returns per-fight results in index order."""
+    options = (jitter, seed, max_ticks, backend)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(lineup, options)
+        return [run_fight(i) for i in range(fights)]
+    # large chunks keep inter-process traffic small; each fight is independent
+    chunksize = max(1, fights // (workers * 8))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(lineup, options)) as pool:
+        return list(pool.map(run_fight, range(fights), chunksize=chunksize))
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Wilson score interval for a binomial proportion."""
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def mean_interval(values, z=Z_95):
+    """Mean with a normal-approximation confidence interval: (mean, low, high)."""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    mean = sum(values) / n
+    if n == 1:
+        return mean, mean, mean
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    half = z * math.sqrt(var / n)
+    return mean, mean - half, mean + half
+
+
+def summarize(results):
+    """Aggregate per-fight results into win rates, fight length and survivors."""
+    n = len(results)
+    summary = {'fights': n, 'win_rate': {}, 'survivors': {}}
+    for outcome in TEAMS + (None,):
+        wins = sum(1 for winner, _, _ in results if winner == outcome)
+        low, high = wilson_interval(wins, n)
+        summary['win_rate'][outcome or 'draw'] = {'rate': wins / n if n else 0.0, 'low': low, 'high': high}
+    mean, low, high = mean_interval([ticks for _, ticks, _ in results])
+    summary['ticks'] = {'mean': mean, 'low': low, 'high': high}
+    for i, team in enumerate(TEAMS):
+        mean, low, high = mean_interval([survivors[i] for _, _, survivors in results])
+        summary['survivors'][team] = {'mean': mean, 'low': low, 'high': high}
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"fights: {summary['fights']}"]
+    for outcome, stat in summary['win_rate'].items():
+        label = 'draws' if outcome == 'draw' else f'{outcome} wins'
+        lines.append(f"{label:>9}: {stat['rate']:6.1%}  [{stat['low']:6.1%}, {stat['high']:6.1%}]")
+    ticks = summary['ticks']
+    lines.append(f"fight length: {ticks['mean']:.0f} ticks ({ticks['mean'] / TICK_RATE:.1f} s)"
+                 f"  [{ticks['low']:.0f}, {ticks['high']:.0f}]")
+    for team, stat in summary['survivors'].items():
+        lines.append(f"{team:>5} survivors: {stat['mean']:.2f}  [{stat['low']:.2f}, {stat['high']:.2f}]")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run many headless fights between two lineups.')
+    parser.add_argument('--blue', nargs='+', required=True, help='blue lineup items (name@r,c, name@x:y or file.json)')
+    parser.add_argument('--red', nargs='*', default=[], help='red lineup items')
+    parser.add_argument('--wave', type=int, default=0,
+                        help='add the extra enemies the game spawns for this round to the red lineup')
+    parser.add_argument('-n', '--fights', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jitter', type=float, default=8, help='max start position offset in pixels')
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS)
+    parser.add_argument('--backend', choices=('python', 'numpy'), default='python')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    args = parser.parse_args(argv)
+
+    lineup = parse_lineup(args.blue, 'blue') + parse_lineup(args.red, 'red')
+    lineup += [dict(spec, team='red') for spec in wave_extras(args.wave)]
+    if not any(spec['team'] == 'red' for spec in lineup):
+        parser.error('the red lineup is empty (use --red and/or --wave)')
+
+    results = run_batch(lineup, args.fights, args.jitter, args.seed, args.max_ticks, args.backend, args.workers)
+    summary = summarize(results)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Benchmark suite: combat ticks, board drawing, map loading, unit spawning, frame memory and cold start.
+
+Runs headless under SDL's dummy video/audio drivers and writes the results as JSON.
+With --compare it checks the results against a stored baseline and exits with
+status 1 when a metric got worse by more than --threshold.
+
+Example:
+    python -m autochess.core.benchmark -o bench.json
+    python -m autochess.core.benchmark --compare bench.json
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from autochess.game.combat import CombatEngine, build_lineup
+
+# total unit counts (both teams) for the combat throughput benchmark
+ROSTER_SIZES = (6, 24, 96)
+UNIT_NAMES = ('warrior', 'archer', 'lancer', 'monk')
+
+# code run in a fresh interpreter for the cold-start benchmark: Game.__init__ without the main loop
+COLD_START_CODE = '''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+from autochess.core.game_loop import Game
+Game.startgame = lambda self: None
+Game()
+'''
+
+# the memory benchmark runs in its own interpreter: the frame caches and the shared atlas are
+# process-wide, so frames loaded by an earlier suite (with the atlas off) would skew the numbers
+MEMORY_CODE = '''
+import json
+from autochess.core.benchmark import bench_memory
+print(json.dumps(bench_memory()))
+'''
+
+
+def metric(value, unit, better):
+    """One benchmark result; `better` is 'higher' or 'lower'."""
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def roster(size):
+    """Deterministic lineup of `size` units split between blue (left) and red (right)."""
+    specs = []
+    per_team = size // 2
+    for team, x0, step in (('blue', 700, -70), ('red', 1300, 70)):
+        for i in range(per_team):
+            col, row = divmod(i, 12)
+            specs.append({'name': UNIT_NAMES[i % len(UNIT_NAMES)], 'team': team,
+                          'pos': (x0 + col * step, 150 + row * 70)})
+    return specs
+
+
+def bench_combat(min_time):
+    """Combat ticks per second for each roster size (headless engine, same logic as the game)."""
+    results = {}
+    for size in ROSTER_SIZES:
+        lineup = roster(size)
+        ticks = 0
+        elapsed = 0.0
+        while elapsed < min_time:
+            engine = CombatEngine(build_lineup(lineup))
+            start = time.perf_counter()
+            while not engine.is_finished() and engine.ticks < 2000:
+                engine.step()
+            elapsed += time.perf_counter() - start
+            ticks += engine.ticks
+        results[f'combat_ticks_per_s_{size}'] = metric(ticks / elapsed, 'ticks/s', 'higher')
+    return results
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_board(frames):
+    """Board build time, full-board draw time and unit spawn latency."""
+    import pygame
+
+    from autochess.game import map_cache
+    from autochess.game.board import Board
+    from config.setting import BOARD_CENTER, SCREEN_HEIGHT, SCREEN_WIDTH
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {}
+
+    start = time.perf_counter()
+    board = Board(hex_center=BOARD_CENTER)
+    results['board_build_first_ms'] = metric((time.perf_counter() - start) * 1000, 'ms', 'lower')
+    # later builds reuse the frame caches; this is the cost of map.tmx loading and baking
+    # (load_map keeps its result for the whole process, so drop it before every build)
+    builds = []
+    for _ in range(3):
+        map_cache._loaded_maps.clear()
+        start = time.perf_counter()
+        board = Board(hex_center=BOARD_CENTER)
+        builds.append((time.perf_counter() - start) * 1000)
+    results['board_build_ms'] = metric(statistics.median(builds), 'ms', 'lower')
+
+    # let the hex grid appear before measuring
+    for _ in range(120):
+        board.tick()
+
+    spawns = []
+    for name in UNIT_NAMES * 3:
+        start = time.perf_counter()
+        unit = board.spawn_blue_unit(name, (BOARD_CENTER[0] - 300, BOARD_CENTER[1]))
+        spawns.append((time.perf_counter() - start) * 1000)
+        if unit is None:
+            break
+    results['unit_spawn_ms'] = metric(statistics.median(spawns), 'ms', 'lower')
+
+    draws = []
+    for _ in range(frames):
+        board.tick()
+        start = time.perf_counter()
+        screen.fill('black')
+        board.draw()
+        draws.append((time.perf_counter() - start) * 1000)
+    results['draw_frame_ms'] = metric(statistics.mean(draws), 'ms', 'lower')
+    results['draw_frame_p95_ms'] = metric(_percentile(draws, 0.95), 'ms', 'lower')
+    return results
+
+
+def bench_memory(use_atlas=True):
+    """Pixel memory of all unit and decoration frames, as separate surfaces and packed in the atlas
+    (the atlas is switched on for the measurement even when TEXTURE_ATLAS is off).
+    Needs empty frame caches, so run_suite calls it through bench_memory_isolated."""
+    import pygame
+
+    from autochess.game.board import Board
+    from autochess.game.units import get_heal_effect_frames, get_unit_frames
+    from autochess.game.combat import UNIT_ANIMATIONS
+    from autochess.utils.atlas import atlas
+    from config.setting import BOARD_CENTER, SCREEN_HEIGHT, SCREEN_WIDTH
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    enabled = atlas.enabled
+    atlas.enabled = use_atlas
+    try:
+        Board(hex_center=BOARD_CENTER)
+        for team in ('blue', 'red'):
+            for name in UNIT_NAMES:
+                for animation in UNIT_ANIMATIONS:
+                    get_unit_frames(team, name, animation, flipped=True)
+            get_heal_effect_frames(team)
+    finally:
+        atlas.enabled = enabled
+    report = atlas.memory_report()
+    mb = 1024 * 1024
+    return {
+        'frame_surfaces': metric(report['surfaces_before'], 'surfaces', 'lower'),
+        'frame_mb': metric(report['frame_bytes'] / mb, 'MB', 'lower'),
+        'atlas_surfaces': metric(report['surfaces_after'], 'surfaces', 'lower'),
+        'atlas_mb': metric(report['bytes_after'] / mb, 'MB', 'lower'),
+    }
+
+
+def bench_memory_isolated():
+    """bench_memory() in a fresh interpreter, so it starts with empty frame caches."""
+    done = subprocess.run([sys.executable, '-c', MEMORY_CODE], check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def bench_cold_start(runs):
+    """Wall time of a fresh interpreter constructing Game (imports, assets, map, menus)."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', COLD_START_CODE], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return {'cold_start_ms': metric(statistics.median(times), 'ms', 'lower')}
+
+
+def run_suite(only=None, quick=False):
+    suites = {
+        'combat': lambda: bench_combat(0.3 if quick else 1.0),
+        'board': lambda: bench_board(60 if quick else 300),
+        'memory': bench_memory_isolated,
+        'startup': lambda: bench_cold_start(1 if quick else 3),
+    }
+    results = {}
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        results.update(suite())
+    import pygame
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Compare results with a baseline; returns (report lines, list of regressed metric names)."""
+    lines = []
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            lines.append(f'{name:<28} {result["value"]:12.2f} {result["unit"]:<8} (no baseline)')
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        worse = -change if result['better'] == 'higher' else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        lines.append(f'{name:<28} {result["value"]:12.2f} {result["unit"]:<8} '
+                     f'baseline {base["value"]:12.2f} ({change:+.1%}){flag}')
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the headless benchmark suite.')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown treated as a regression (default 0.10)')
+    parser.add_argument('--only', nargs='+', choices=('combat', 'board', 'memory', 'startup'))
+    parser.add_argument('--quick', action='store_true', help='shorter runs (noisier numbers)')
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.only, args.quick)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if not args.compare:
+        if not args.output:
+            print(json.dumps(current, indent=2))
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    lines, regressions = compare(current, baseline, args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,25 @@ import sys
 
 import pygame
 
+from autochess.game import map_cache
 from autochess.game.board import Board
+from autochess.game.units import unit_asset_paths
 from autochess.ui.background import \
     BackgroundStatic  # static background helper
+from autochess.ui.loading import LoadingScreen
 from autochess.ui.menu import Menu
 from autochess.ui.settings import SettingsScreen
 from autochess.ui.shop import Shop
-from config.setting import (COLOR_BG, COLOR_HIGHLIGHT, COLOR_SUBTLE,
-                            COLOR_TEXT, DEFAULT_VOLUME, FPS, MUSIC_PATH,
-                            SCREEN_HEIGHT, SCREEN_WIDTH, title_size)
+from autochess.utils.assets import MAP_ASSET_DIRS, MENU_ASSETS, asset_paths, discard, preload
+from autochess.utils.profiler import profiler
+from config.setting import (BOARD_CENTER, COLOR_BG, COLOR_HIGHLIGHT,
+                            COLOR_SUBTLE, COLOR_TEXT, DEFAULT_VOLUME,
+                            DIRTY_RECTS, FPS, MAP_PATH, MAX_FRAME_TIME,
+                            MUSIC_PATH, SCREEN_HEIGHT, SCREEN_WIDTH,
+                            TICK_RATE)
+
+# length of one simulation tick in seconds
+TICK_TIME = 1.0 / TICK_RATE
 
 
 class Game:
@@ -28,6 +38,19 @@ class Game:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("HEXA")
 
+        # Decode images on a thread pool: menu art first, then everything PLAY needs in the background
+        self.loading_screen = LoadingScreen(
+            screen=self.screen,
+            colors={"bg": COLOR_BG, "text": COLOR_TEXT, "highlight": COLOR_HIGHLIGHT},
+        )
+        self.loading_screen.draw(0.0, "Loading...")
+        menu_assets = preload(MENU_ASSETS)
+        play_assets = asset_paths() + unit_asset_paths()
+        # the map cache gets (re)built on the first Play and needs the tile sheets
+        self._map_assets = [] if map_cache.is_fresh(MAP_PATH) else asset_paths(MAP_ASSET_DIRS, ())
+        self._play_assets = preload(play_assets + self._map_assets)
+        self.loading_screen.wait(menu_assets, "Loading...")
+
         # States
         self.state = "MENU"
         # start with a sensible default; may be overridden by settings screen/app saved state
@@ -40,22 +63,18 @@ class Game:
         # Try load menu music early (volume will be applied again after settings are loaded)
         self._ensure_play_music(MUSIC_PATH, self.volume)
 
-        # Core
-        self.board = Board(hex_center=(SCREEN_WIDTH // 2 + title_size, SCREEN_HEIGHT // 2))
+        # Core (board and shop are built on the first switch to PLAY, see _ensure_play_assets)
+        self.board = None
+        self.shop = None
         self.clock = pygame.time.Clock()
+        # real time of the last frame and time not yet consumed by simulation ticks
+        self._frame_time = 0.0
+        self._accumulator = 0.0
+        # what the last PLAY frame was drawn for; any change forces a full redraw in dirty-rect mode
+        self._render_key = None
         # Turn-based phases inside PLAY
         self.phase = 'PLANNING'  # 'PLANNING' | 'COMBAT'
 
-        # Shop overlay (planning only)
-        self.shop = Shop(
-            screen=self.screen,
-            items=['warrior', 'archer', 'lancer', 'monk'],
-            colors={"bg": (20, 20, 28), "border": COLOR_HIGHLIGHT, "text": COLOR_TEXT},
-            on_spawn=self._shop_spawn_unit,
-            on_get_gold=self._get_gold,
-            on_deduct_gold=self._deduct_gold,
-        )
-
         # Static archer background (scaled+cropped)
         self.menu_bg = BackgroundStatic(
             screen=self.screen, image_path="files/ui/bg_archer.png", overlay_alpha=28
@@ -77,6 +96,8 @@ class Game:
             colors={"text": COLOR_TEXT, "highlight": COLOR_HIGHLIGHT, "subtle": COLOR_SUBTLE},
             game_ref=self,
         )
+        # menu art is only read while the screens above are built
+        discard(MENU_ASSETS)
 
         # Read saved settings / current mixer and apply to game audio state
         try:
@@ -97,6 +118,45 @@ class Game:
 
         self.startgame()
 
+    def _ensure_play_assets(self):
+        """Build the board and the shop the first time PLAY is entered (after their images decode)."""
+        if self.board is not None:
+            return
+        self.loading_screen.wait(self._play_assets, "Loading board...")
+        self._play_assets = []
+        self.board = Board(hex_center=BOARD_CENTER)
+        self.board.all_sprites.track_dirty = DIRTY_RECTS
+        # tile sheets the map did not use; unit sheets stay for units spawned later
+        discard(self._map_assets)
+        self._map_assets = []
+
+        # Shop overlay (planning only)
+        self.shop = Shop(
+            screen=self.screen,
+            items=['warrior', 'archer', 'lancer', 'monk'],
+            colors={"bg": (20, 20, 28), "border": COLOR_HIGHLIGHT, "text": COLOR_TEXT},
+            on_spawn=self._shop_spawn_unit,
+            on_get_gold=self._get_gold,
+            on_deduct_gold=self._deduct_gold,
+        )
+
+    def _draw_board(self, alpha):
+        """Draw the board for one PLAY frame. In dirty-rect mode only changed regions are redrawn
+        while the phase, the screen and the profiler overlay stay the same; any change to them
+        forces a full redraw. Returns the rects for pygame.display.update, or None after a full redraw."""
+        render_key = (self.phase, id(self.screen), self.screen.get_size(), profiler.shown)
+        update_rects = None
+        if DIRTY_RECTS and render_key == self._render_key:
+            overlay = self.shop.dirty_rects() if self.phase == 'PLANNING' else []
+            if profiler.shown:
+                overlay = list(overlay) + [profiler.rect]
+            update_rects = self.board.draw(dirty=True, overlay_rects=overlay, alpha=alpha)
+        else:
+            self.screen.fill("black")
+            self.board.draw(alpha=alpha)
+        self._render_key = render_key
+        return update_rects
+
     def _shop_spawn_unit(self, name: str, pos):
         """Spawn a blue unit via Board, return the instance for drag selection."""
         try:
@@ -179,28 +239,66 @@ class Game:
         # reassign screens & rebuild scaled backgrounds
         self.menu.screen = self.screen
         self.settings_screen.screen = self.screen
-        if hasattr(self, 'shop'):
+        self.loading_screen.screen = self.screen
+        if self.shop is not None:
             self.shop.screen = self.screen
         self.menu_bg = BackgroundStatic(
             screen=self.screen, image_path="files/ui/bg_archer.png", overlay_alpha=28
         )
         # settings_screen will rebuild its internal scaled modal on next draw if needed.
 
+    def _check_round_end(self):
+        """Finish the combat round once one side has no units left."""
+        if self.phase != 'COMBAT' or not self.board.hex_manager.is_combat_active():
+            return
+        blue_alive, red_alive = self.board.team_alive_counts()
+        if blue_alive == 0 or red_alive == 0:
+            # End of round
+            player_won = blue_alive > 0 and red_alive == 0
+            # Reset combat visuals
+            self.board.hex_manager.toggle_combat()  # back to planning
+            if player_won:
+                # Advance round, reset units and add new enemies
+                self.board.current_round += 1
+                self.board.reset_units_to_initial()
+                self.board.add_enemies_for_round(self.board.current_round)
+                # Grant gold reward for winning the round
+                self.board.gold += 5
+            else:
+                # Loss: restore last planning layout to retry
+                self.board.restore_planning_layout()
+                # Rebuild enemies strictly from snapshot positions (no extras)
+                self.board.rebuild_enemies_from_snapshot(include_extras=False,
+                                                         round_num=self.board.current_round)
+                # Placeholder: reverse purchases from snapshot
+                # TODO: rollback buys stored in snapshot
+            self.phase = 'PLANNING'
+
     def startgame(self):
         # path for PLAY music
         play_music_path = "files/audio/buying_phase.wav"
         menu_music_path = MUSIC_PATH  # from config (menu.wav)
 
         while True:
+            profiler.begin('events')
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     sys.exit(0)
 
+                # profiler overlay (F3) and per-frame CSV trace (F4), in every state
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.toggle_trace()
+                    continue
+
                 if self.state == "MENU":
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                         sys.exit(0)
                     action = self.menu.handle_event(event)
                     if action == "play":
+                        self._ensure_play_assets()
                         self.state = "PLAY"
                         # switch to play music
                         self._ensure_play_music(play_music_path, self.volume)
@@ -253,7 +351,10 @@ class Game:
                     if self.phase == 'PLANNING':
                         _ = self.shop.handle_event(event)
 
+            profiler.end()
+
             # Draw per state
+            update_rects = None
             if self.state == "MENU":
                 # draw archer background and menu
                 self.menu_bg.draw()
@@ -266,39 +367,46 @@ class Game:
             elif self.state == "PLAY":
                 # ensure play music is active (in case something external changed it)
                 self._ensure_play_music(play_music_path, self.volume)
-                self.screen.fill("black")
-                self.board.run()
+
+                # Fixed-timestep simulation: as many ticks as real time allows, independent of FPS
+                self._accumulator += min(self._frame_time, MAX_FRAME_TIME)
+                while self._accumulator >= TICK_TIME:
+                    self.board.tick()
+                    self._accumulator -= TICK_TIME
+                    # Round end detection during combat
+                    self._check_round_end()
+                alpha = self._accumulator / TICK_TIME
+
+                update_rects = self._draw_board(alpha)
                 if self.phase == 'PLANNING':
                     # Draw shop UI above the board during planning
+                    profiler.begin('shop')
                     self.shop.draw()
-
-                # Round end detection during combat
-                if self.phase == 'COMBAT' and self.board.hex_manager.is_combat_active():
-                    blue_alive, red_alive = self.board.team_alive_counts()
-                    if blue_alive == 0 or red_alive == 0:
-                        # End of round
-                        player_won = blue_alive > 0 and red_alive == 0
-                        # Reset combat visuals
-                        self.board.hex_manager.toggle_combat()  # back to planning
-                        if player_won:
-                            # Advance round, reset units and add new enemies
-                            self.board.current_round += 1
-                            self.board.reset_units_to_initial()
-                            self.board.add_enemies_for_round(self.board.current_round)
-                            # Grant gold reward for winning the round
-                            self.board.gold += 5
-                        else:
-                            # Loss: restore last planning layout to retry
-                            self.board.restore_planning_layout()
-                            # Rebuild enemies strictly from snapshot positions (no extras)
-                            self.board.rebuild_enemies_from_snapshot(include_extras=False,
-                                                                     round_num=self.board.current_round)
-                            # Placeholder: reverse purchases from snapshot
-                            # TODO: rollback buys stored in snapshot
-                        self.phase = 'PLANNING'
-
-            pygame.display.update()
-            self.clock.tick(FPS)
+                    profiler.end()
+
+            if self.state != "PLAY":
+                self._render_key = None
+                self._accumulator = 0.0
+            if profiler.shown:
+                profiler.begin('overlay')
+                overlay_rect = profiler.draw(self.screen, FPS)
+                if update_rects is not None:
+                    update_rects = list(update_rects) + [overlay_rect]
+                profiler.end()
+            profiler.begin('display')
+            if update_rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(update_rects)
+            profiler.end()
+            profiler.begin('wait')
+            self._frame_time = self.clock.tick(FPS) / 1000.0
+            profiler.end()
+            if profiler.active:
+                if self.board is not None:
+                    profiler.frame(len(self.board.all_sprites), self.board.team_alive_counts())
+                else:
+                    profiler.frame()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,18 @@
+from functools import lru_cache
 from random import choice, randrange
 
-from pytmx.util_pygame import load_pygame
-
 from autochess.utils.config import *
+from autochess.utils.profiler import profiler
 from config.setting import *
 
+from .combat import wave_extras
 from .hex_board import HexGridManager
+from .map_cache import SHEET_LAYERS, load_map
 from .sprites import Animate, Generic
-from .units import Unit
+from .units import Unit, UnitPool
+
+# Nieanimowane warstwy mapy, wypalane przy starcie w jedną powierzchnię na pasmo kolejnych warstw
+STATIC_LAYERS = ('Background', 'Background2', 'ObjectsDecorations', 'Decoration2', 'Decoration', 'Area')
 
 
 class Board:
@@ -22,6 +27,9 @@ class Board:
         # Gold tracking
         self.gold = 10  # Starting gold
 
+        # units are recycled between rounds instead of being killed and rebuilt
+        self.unit_pool = UnitPool()
+
         # Note: no initial user (blue) units are spawned.
         # Players will place units manually via the shop using spawn_blue_unit.
 
@@ -54,12 +62,15 @@ class Board:
              name='archer',
              team='red')
 
+        for u in self.units:
+            self.unit_pool.adopt(u)
+
         self.hex_center_pos = hex_center
 
         # Draw hex grid behind other sprites
         self.hex_manager = HexGridManager(
-            cols=9,
-            rows=6,
+            cols=BOARD_COLS,
+            rows=BOARD_ROWS,
             center_pos=self.hex_center_pos,
             group=self.all_sprites,
             units=self.units,
@@ -89,93 +100,84 @@ class Board:
     def setup(self):
         self.hex_manager.generate()
 
-        tmx_data = load_pygame('files/map_tiled/map.tmx')
-        tile_w, tile_h = tmx_data.tilewidth, tmx_data.tileheight
-
-        for layer in tmx_data.layernames:
-            if layer == 'Area':
-                for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                    Generic(surf, (x * tile_w, y * tile_h), self.all_sprites, Layer[layer])
-
-            if layer in ('Decoration', 'Decoration2', 'Background2', 'Background'):
-                for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                    Generic(surf, (x * tile_w, y * tile_h), self.all_sprites, Layer[layer])
-
-            if layer == 'ObjectsDecorations':
-                for obj in tmx_data.get_layer_by_name(layer):
-                    Generic(obj.image, (obj.x, obj.y), self.all_sprites, Layer[layer])
-
-            if layer == 'Sheep':
-                for x, y, _ in tmx_data.get_layer_by_name(layer).tiles():
-                    surfs = import_img('files/tiles/Sheep_Idle.png', 128)
-                    k = randrange(len(surfs)) if surfs else 0
-                    surfs = surfs[k:] + surfs[:k]
-                    w = surfs[0].get_width()
-                    h = surfs[0].get_height()
-
-                    base_x = x * tile_w
-                    base_y = y * tile_h
-
-                    offset_x = (w - tile_w) // 2
-                    offset_y = h - tile_h
-                    Animate(surfs, (base_x - offset_x, base_y - offset_y), self.all_sprites, Layer[layer])
-
-            if layer == 'Tree':
-                tree_layer = tmx_data.get_layer_by_name(layer)
-                for x, y, _ in tree_layer.tiles():
-                    file_name = choice([f for f in ['Tree1', 'Tree2', 'Tree3', 'Tree4']])
-                    pixelsize_two = 256 if file_name == 'Tree1' or file_name == 'Tree2' else 192
-                    surfs = import_img_two_diff_sizes(f'files/tiles/{file_name}.png', 192, pixelsize_two)
-                    k = randrange(len(surfs)) if surfs else 0
-                    surfs = surfs[k:] + surfs[:k]
-                    w = surfs[0].get_width()
-                    h = surfs[0].get_height()
-
-                    base_x = x * tile_w
-                    base_y = y * tile_h
-
-                    offset_x = (w - tile_w) // 2
-                    offset_y = h - tile_h
-
-                    Animate(surfs, (base_x - offset_x, base_y - offset_y), self.all_sprites, Layer[layer])
-
-            if layer == 'Rock':
-                tree_layer = tmx_data.get_layer_by_name(layer)
-                for x, y, _ in tree_layer.tiles():
-                    file_name = choice(
-                        [f for f in ['Water Rocks_01', 'Water Rocks_02', 'Water Rocks_03', 'Water Rocks_04']])
-                    surfs = import_img(f'files/tiles/{file_name}.png', 64)
-                    k = randrange(len(surfs)) if surfs else 0
-                    surfs = surfs[k:] + surfs[:k]
-
-                    Animate(surfs, (x * tile_w, y * tile_h), self.all_sprites, Layer[layer])
-
-            if layer == 'Bushes':
-                tree_layer = tmx_data.get_layer_by_name(layer)
-                for x, y, _ in tree_layer.tiles():
-                    file_name = choice([f for f in ['Bushe1', 'Bushe2', 'Bushe3', 'Bushe4']])
-                    surfs = import_img(f'files/tiles/{file_name}.png', 128)
-                    k = randrange(len(surfs)) if surfs else 0
-                    surfs = surfs[k:] + surfs[:k]
-                    w = surfs[0].get_width()
-                    h = surfs[0].get_height()
-
-                    base_x = x * tile_w
-                    base_y = y * tile_h
-
-                    offset_x = (w - tile_w) // 2
-                    offset_y = h - tile_h
-
-                    Animate(surfs, (base_x - offset_x, base_y - offset_y), self.all_sprites, Layer[layer])
-
-    def run(self):
+        map_data = load_map(MAP_PATH)
+        tile_w, tile_h = map_data['tile_size']
+
+        static_tiles = {}  # z -> [(surf, pos)] w kolejności rysowania
+        for layer, surf, pos in map_data['static']:
+            static_tiles.setdefault(Layer[layer], []).append((surf, pos))
+
+        # animowane dekoracje: losowy wariant arkusza i przesunięta klatka startowa, stopami na kafelku
+        for layer, cells in map_data['placements']:
+            variants = [name for name, _, _ in SHEET_LAYERS[layer]]
+            for x, y in cells:
+                file_name = choice(variants) if len(variants) > 1 else variants[0]
+                surfs = map_data['sheets'][file_name]
+                k = randrange(len(surfs)) if surfs else 0
+                surfs = surfs[k:] + surfs[:k]
+                w = surfs[0].get_width()
+                h = surfs[0].get_height()
+
+                base_x = x * tile_w
+                base_y = y * tile_h
+
+                offset_x = (w - tile_w) // 2
+                offset_y = h - tile_h
+                Animate(surfs, (base_x - offset_x, base_y - offset_y), self.all_sprites, Layer[layer])
+
+        self.bake_static_layers(static_tiles)
+
+    def bake_static_layers(self, static_tiles):
+        """Połącz statyczne kafelki w jedną powierzchnię na każde pasmo kolejnych warstw z STATIC_LAYERS.
+        Pasmo jest rysowane jednym blitem, w miejscu swojej najwyższej warstwy z Layer."""
+        bands = [[]]
+        for name, z in sorted(Layer.items(), key=lambda item: item[1]):
+            if name in STATIC_LAYERS:
+                bands[-1].append(z)
+            elif bands[-1]:
+                bands.append([])
+
+        for band in bands:
+            tiles = [tile for z in band for tile in static_tiles.get(z, [])]
+            if not tiles:
+                continue
+            rects = [surf.get_rect(topleft=pos) for surf, pos in tiles]
+            area = rects[0].unionall(rects[1:])
+            baked = pygame.Surface(area.size, pygame.SRCALPHA)
+            for (surf, _), rect in zip(tiles, rects):
+                baked.blit(surf, rect.move(-area.x, -area.y))
+            Generic(baked.convert_alpha(), area.topleft, self.all_sprites, band[-1])
+
+    def tick(self):
+        """Advance the simulation by one fixed tick (grid, drag, combat, animations).
+        Stats in UNIT_STATS are counted in ticks, so results do not depend on the frame rate."""
         # ensure occupancy is initialized once grid generated
         if not getattr(self, '_occ_init_done', False) and getattr(self.hex_manager, 'generated', False):
             self.hex_manager.initialize_occupancy()
             self._occ_init_done = True
+        profiler.tick()
+        self.all_sprites.store_positions()
+        profiler.begin('grid')
         self.hex_manager.update()
-        self.all_sprites.custom_draw()
+        profiler.end()
+        profiler.begin('update')
         self.all_sprites.update()
+        profiler.end()
+
+    def draw(self, dirty=False, overlay_rects=(), alpha=1.0):
+        """Draw one frame, moving sprites interpolated by alpha (0..1) between the last two ticks.
+        With dirty=True only changed regions (plus overlay_rects) are redrawn and returned
+        for pygame.display.update; otherwise the whole board is drawn and None is returned."""
+        profiler.begin('draw')
+        moved = self.all_sprites.interpolate(alpha)
+        if dirty:
+            update_rects = self.all_sprites.draw_dirty(overlay_rects)
+        else:
+            self.all_sprites.custom_draw()
+            update_rects = None
+        self.all_sprites.restore_positions(moved)
+        profiler.end()
+        return update_rects
 
     # --- Round helpers ---
     def snapshot_planning_layout(self):
@@ -204,30 +206,18 @@ class Board:
         to their planning positions instead of death positions.
         """
         base = self._enemy_snapshot if self._enemy_snapshot is not None else self._enemy_round_base
-        # remove all current red units
-        for u in list(self.units):
-            if getattr(u, 'team', None) == 'red':
-                u.kill()
+        # return all current red units (alive or dead) to the pool
+        self.unit_pool.release_team('red')
         recreated = []
         # recreate snapshot enemies at their center positions
         for spec in base:
-            new_u = Unit(groups=[self.all_sprites, self.units], pos=spec['pos'], name=spec['name'], team='red')
-            new_u.rect.center = spec['pos']
-            new_u.sync_pos_from_rect()
-            new_u.hitbox = new_u.rect.copy().inflate(-new_u.rect.width * 0.7, -new_u.rect.height * 0.7)
-            self._reset_unit_state(new_u)
+            self._acquire_unit(spec, 'red')
             recreated.append({'name': spec['name'], 'pos': spec['pos']})
 
         if include_extras:
-            extra_count = max(0, round_num - 1)
-            for i in range(extra_count):
-                pos = (1100 - i * 60, 220 + (i % 2) * 80)
-                new_u = Unit(groups=[self.all_sprites, self.units], pos=pos, name='warrior', team='red')
-                new_u.rect.center = pos
-                new_u.sync_pos_from_rect()
-                new_u.hitbox = new_u.rect.copy().inflate(-new_u.rect.width * 0.7, -new_u.rect.height * 0.7)
-                self._reset_unit_state(new_u)
-                recreated.append({'name': 'warrior', 'pos': pos})
+            for spec in wave_extras(round_num):
+                self._acquire_unit(spec, 'red')
+                recreated.append(spec)
 
         self._enemy_round_base = recreated
         self.hex_manager.initialize_occupancy()
@@ -242,20 +232,18 @@ class Board:
                 u.sync_pos_from_rect()
                 u.hitbox = u.rect.copy().inflate(-u.rect.width * 0.7, -u.rect.height * 0.7)
                 self._reset_unit_state(u)
+            else:
+                self.unit_pool.release(u)
+        # re-seat restored units on their hexes
+        self.hex_manager.initialize_occupancy()
 
     def reset_units_to_initial(self):
         """Rebuild player (blue) units to the latest planning baseline for the next round."""
-        # remove all current blue units
-        for u in list(self.units):
-            if getattr(u, 'team', None) == 'blue':
-                u.kill()
+        # return all current blue units (alive or dead) to the pool
+        self.unit_pool.release_team('blue')
         # recreate from round baseline
         for spec in self._blue_round_base:
-            new_u = Unit(groups=[self.all_sprites, self.units], pos=spec['pos'], name=spec['name'], team='blue')
-            new_u.rect.center = spec['pos']
-            new_u.sync_pos_from_rect()
-            new_u.hitbox = new_u.rect.copy().inflate(-new_u.rect.width * 0.7, -new_u.rect.height * 0.7)
-            self._reset_unit_state(new_u)
+            self._acquire_unit(spec, 'blue')
         # refresh occupancy after rebuild
         self.hex_manager.initialize_occupancy()
 
@@ -263,31 +251,17 @@ class Board:
         """Rebuild enemies from last snapshot/base and add extras for scaling."""
         # choose snapshot if available, else baseline
         base = self._enemy_snapshot if self._enemy_snapshot is not None else self._enemy_round_base
-        # remove all current red units
-        for u in list(self.units):
-            if getattr(u, 'team', None) == 'red':
-                u.kill()
-        # recreate base enemies
+        # return all current red units (alive or dead) to the pool
+        self.unit_pool.release_team('red')
+        # recreate base enemies (stored position is the center, not topleft)
         recreated = []
         for spec in base:
-            new_u = Unit(groups=[self.all_sprites, self.units], pos=spec['pos'], name=spec['name'], team='red')
-            # Treat stored position as center, not topleft
-            new_u.rect.center = spec['pos']
-            new_u.sync_pos_from_rect()
-            new_u.hitbox = new_u.rect.copy().inflate(-new_u.rect.width * 0.7, -new_u.rect.height * 0.7)
-            self._reset_unit_state(new_u)
+            self._acquire_unit(spec, 'red')
             recreated.append({'name': spec['name'], 'pos': spec['pos']})
         # add extras based on round number
-        extra_count = max(0, round_num - 1)
-        for i in range(extra_count):
-            pos = (1100 - i * 60, 220 + (i % 2) * 80)
-            new_u = Unit(groups=[self.all_sprites, self.units], pos=pos, name='warrior', team='red')
-            # Center-based placement for consistency
-            new_u.rect.center = pos
-            new_u.sync_pos_from_rect()
-            new_u.hitbox = new_u.rect.copy().inflate(-new_u.rect.width * 0.7, -new_u.rect.height * 0.7)
-            self._reset_unit_state(new_u)
-            recreated.append({'name': 'warrior', 'pos': pos})
+        for spec in wave_extras(round_num):
+            self._acquire_unit(spec, 'red')
+            recreated.append(spec)
         # update base for next round progression
         self._enemy_round_base = recreated
         # refresh occupancy after enemies
@@ -300,18 +274,11 @@ class Board:
 
     def _reset_unit_state(self, u):
         """Clear combat/animation flags and cooldowns to prevent freeze."""
-        u.status = 'Idle'
-        u.attack_cooldown = 0
-        u.heal_cooldown = 0
-        u.is_attacking = False
-        u.is_healing = False
-        u.pending_shot = False
-        u.shot_target = None
-        u.shot_delay = 0
-        u.pending_heal = False
-        u.heal_target = None
-        u.heal_action_delay = 0
-        u.target = None
+        u.reset_combat_state()
+
+    def _acquire_unit(self, spec, team):
+        """Place a unit from the pool (or a new one) with its center at spec['pos']."""
+        return self.unit_pool.acquire([self.all_sprites, self.units], spec['pos'], spec['name'], team)
 
     def spawn_blue_unit(self, name: str, pos: tuple[int, int]):
         """Create a new blue unit and place it on the closest free hex.
@@ -327,31 +294,129 @@ class Board:
             key=lambda hh: (hh.rect.centerx - pos[0]) ** 2 + (hh.rect.centery - pos[1]) ** 2
         )
 
-        # Create the unit only now, once we know we can place it
-        u = Unit(groups=[self.all_sprites, self.units], pos=chosen_hex.rect.center, name=name, team='blue')
-        u.rect.center = chosen_hex.rect.center
-        u.sync_pos_from_rect()
-        u.hitbox = u.rect.copy().inflate(-u.rect.width * 0.7, -u.rect.height * 0.7)
-        self._reset_unit_state(u)
+        # Create (or take from the pool) the unit only now, once we know we can place it
+        u = self.unit_pool.acquire([self.all_sprites, self.units], chosen_hex.rect.center, name, 'blue')
 
         # Assign to occupancy map for that hex (guaranteed free)
         self.hex_manager.assign_unit_to_hex(u, chosen_hex)
         return u
 
 
+@lru_cache(maxsize=None)
+def _hp_bar_image(red, bar_width, fg_width, shade, bar_height):
+    # AI – czerwony pasek, gracz / inne – niebieski; jaśniejszy przy wysokim HP
+    fill_color = ((220, 60, 60), (200, 40, 40), (150, 20, 20))[shade] if red else \
+        ((50, 150, 255), (40, 110, 220), (20, 70, 150))[shade]
+    image = pygame.Surface((bar_width, bar_height))
+    # Tło (ciemne) + wypełnienie + wspólna, cienka czarna ramka
+    image.fill((20, 20, 20))
+    if fg_width > 0:
+        image.fill(fill_color, (0, 0, fg_width, bar_height))
+    pygame.draw.rect(image, (0, 0, 0), image.get_rect(), 1)
+    return image.convert()
+
+
+def get_hp_bar_image(red, bar_width, ratio, bar_height=5):
+    """Zwróć gotowy pasek HP; ratio jest kwantyzowane do pikseli wypełnienia i progu koloru"""
+    shade = 0 if ratio > 0.5 else 1 if ratio > 0.2 else 2
+    return _hp_bar_image(red, bar_width, int(bar_width * ratio), shade, bar_height)
+
+
 class CameraGroup(pygame.sprite.Group):
     def __init__(self):
+        # kubełki sprite'ów według warstwy: z -> {sprite: None} w kolejności dodania
+        self._buckets = {}
+        # sprite'y czekające na przydział do kubełka (konstruktory ustawiają z dopiero po dodaniu do grupy)
+        self._pending = []
+        # tryb dirty-rect: stan narysowanych sprite'ów (sprite -> (image, rect, hp)) i obszary usuniętych
+        self.track_dirty = False
+        self._drawn = {}
+        self._lost_rects = []
+        # środki ruchomych sprite'ów (warstwa Units) sprzed ostatniego ticku, do interpolacji
+        self._prev_centers = {}
+        # ostatni pasek HP jednostki: sprite -> ((hp, max_hp, szerokość, drużyna), obrazek)
+        self._hp_bars = {}
         super().__init__()
         self.display_surf = pygame.display.get_surface()
 
-    def _draw_hp_bar(self, sprite):
-        """Rysuje pasek HP nad daną jednostką."""
-        if not (hasattr(sprite, 'hp') and hasattr(sprite, 'max_hp') and getattr(sprite, 'alive', True)):
-            return
-
-        max_hp = max(1, sprite.max_hp)
-        ratio = max(0, min(sprite.hp / max_hp, 1))
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._pending.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        bucket = self._buckets.get(getattr(sprite, 'z', None))
+        if bucket is not None:
+            bucket.pop(sprite, None)
+        self._hp_bars.pop(sprite, None)
+        drawn = self._drawn.pop(sprite, None)
+        if drawn is not None and self.track_dirty:
+            self._lost_rects.append(pygame.Rect(drawn[1]))
+
+    def _flush_pending(self):
+        """Przydziel nowo dodane sprite'y do kubełków według ich warstwy z"""
+        for sprite in self._pending:
+            if self.has(sprite):
+                self._buckets.setdefault(sprite.z, {})[sprite] = None
+        self._pending.clear()
+
+    def store_positions(self):
+        """Zapamiętaj środki ruchomych sprite'ów przed tickiem symulacji"""
+        self._flush_pending()
+        self._prev_centers = {sprite: sprite.rect.center for sprite in self._buckets.get(Layer['Units'], ())}
+
+    def interpolate(self, alpha):
+        """Przesuń rect-y ruchomych sprite'ów na pozycję pośrednią między dwoma tickami.
+        Zwraca listę (sprite, prawdziwy środek) dla restore_positions."""
+        moved = []
+        if alpha >= 1:
+            return moved
+        for sprite, (px, py) in self._prev_centers.items():
+            x, y = sprite.rect.center
+            if (x, y) == (px, py) or not self.has(sprite):
+                continue
+            # skoki (reset rundy, upuszczenie na heks) rysujemy od razu w nowym miejscu
+            if abs(x - px) > INTERPOLATION_MAX_STEP or abs(y - py) > INTERPOLATION_MAX_STEP:
+                continue
+            moved.append((sprite, (x, y)))
+            sprite.rect.center = (round(px + (x - px) * alpha), round(py + (y - py) * alpha))
+        return moved
+
+    def restore_positions(self, moved):
+        """Przywróć prawdziwe pozycje po narysowaniu klatki"""
+        for sprite, center in moved:
+            sprite.rect.center = center
+
+    def _draw_layers(self):
+        """Zwróć listę (warstwa, sprite'y) w kolejności rysowania"""
+        self._flush_pending()
+        layers = []
+        for layer in Layer.values():
+            bucket = self._buckets.get(layer)
+            if not bucket:
+                continue
+            if layer == Layer['Units']:
+                # jednostki niżej na ekranie rysowane na wierzchu
+                layers.append((layer, sorted(bucket, key=lambda sprite: sprite.rect.centery)))
+            else:
+                layers.append((layer, bucket.keys()))
+        return layers
+
+    def _track(self, sprite):
+        """Zapamiętaj stan sprite'a; zwraca poprzedni prostokąt (lub None), jeśli sprite się zmienił"""
+        state = (sprite.image, tuple(sprite.rect), getattr(sprite, 'hp', None))
+        prev = self._drawn.get(sprite)
+        changed = (prev is None or prev[0] is not state[0] or prev[1] != state[1] or prev[2] != state[2]
+                   or getattr(sprite, 'dirty', 0))
+        if not changed:
+            return None
+        self._drawn[sprite] = state
+        if getattr(sprite, 'dirty', 0):
+            sprite.dirty = 0
+        return pygame.Rect(prev[1]) if prev is not None else sprite.rect.copy()
 
+    def _hp_bar_rect(self, sprite):
+        """Prostokąt paska HP danej jednostki."""
         # Szerokość dopasowana do jednostki (lekko mniejsza niż sprite)
         base_width = sprite.rect.width
         bar_width = int(base_width * 0.9)
@@ -362,58 +427,102 @@ class CameraGroup(pygame.sprite.Group):
         # Pasek przesunięty wyżej względem sprite'a (top - 40)
         bar_y = sprite.rect.top + 40
 
-        bg_rect = pygame.Rect(bar_x, bar_y, bar_width, bar_height)
+        return pygame.Rect(bar_x, bar_y, bar_width, bar_height)
 
-        # Kolor wypełnienia zależny od drużyny i poziomu HP
-        if hasattr(sprite, 'team') and sprite.team == 'red':
-            # AI – czerwony pasek, od jasnego do ciemnego odcienia w zależności od HP
-            if ratio > 0.5:
-                fill_color = (220, 60, 60)
-            elif ratio > 0.2:
-                fill_color = (200, 40, 40)
-            else:
-                fill_color = (150, 20, 20)
-        else:
-            # Gracz / inne – niebieski pasek, jaśniejszy przy wysokim HP
-            if ratio > 0.5:
-                fill_color = (50, 150, 255)
-            elif ratio > 0.2:
-                fill_color = (40, 110, 220)
-            else:
-                fill_color = (20, 70, 150)
-
-        # Tło (ciemne) + wypełnienie
-        pygame.draw.rect(self.display_surf, (20, 20, 20), bg_rect)
-
-        fg_width = int(bar_width * ratio)
-        if fg_width > 0:
-            fg_rect = pygame.Rect(bar_x, bar_y, fg_width, bar_height)
-            pygame.draw.rect(self.display_surf, fill_color, fg_rect)
-
-        # Wspólna, cienka czarna ramka dla wszystkich jednostek
-        pygame.draw.rect(self.display_surf, (0, 0, 0), bg_rect, 1)
+    def _hp_bar(self, sprite):
+        """(obrazek, prostokąt) paska HP jednostki albo None; obrazek wybierany ponownie tylko po zmianie HP."""
+        if not (hasattr(sprite, 'hp') and hasattr(sprite, 'max_hp') and getattr(sprite, 'alive', True)):
+            return None
+        rect = self._hp_bar_rect(sprite)
+        state = (sprite.hp, sprite.max_hp, rect.width, getattr(sprite, 'team', None))
+        cached = self._hp_bars.get(sprite)
+        if cached is None or cached[0] != state:
+            ratio = max(0, min(sprite.hp / max(1, sprite.max_hp), 1))
+            cached = self._hp_bars[sprite] = (state, get_hp_bar_image(state[3] == 'red', rect.width, ratio))
+        return cached[1], rect
 
     def custom_draw(self):
-        # Najpierw rysujemy wszystkie sprite'y warstwami
-        for layer in Layer.values():
-            for sprite in self.sprites():
-                if layer == sprite.z:
-                    self.display_surf.blit(sprite.image, sprite.rect)
-                    # Debug hitboxów (opcjonalnie):
-                    # if layer == Layer['Units']:
-                    #     hitbox_surf = pygame.Surface((sprite.hitbox.width, sprite.hitbox.height))
-                    #     hitbox_surf.fill('red')
-                    #     self.display_surf.blit(hitbox_surf, sprite.hitbox)
-                    # if layer == Layer['Positions']:
-                    #     hitbox_surf = pygame.Surface((sprite.hitbox.width, sprite.hitbox.height))
-                    #     hitbox_surf.fill('blue')
-                    #     self.display_surf.blit(hitbox_surf, sprite.hitbox)
-                    # if hasattr(sprite, 'hitbox_b'):
-                    #     hitbox_b_surf = pygame.Surface((sprite.hitbox_b.width, sprite.hitbox_b.height))
-                    #     hitbox_b_surf.fill('blue')
-                    #     self.display_surf.blit(hitbox_b_surf, sprite.hitbox_b)
-
-        # Na końcu osobno rysujemy paski HP dla jednostek, żeby były na wierzchu
-        for sprite in self.sprites():
-            if sprite.z == Layer['Units']:
-                self._draw_hp_bar(sprite)
+        # Jedno przejście po kubełkach w kolejności warstw z Layer
+        units = ()
+        for layer, sprites in self._draw_layers():
+            if layer == Layer['Units']:
+                units = sprites
+            for sprite in sprites:
+                self.display_surf.blit(sprite.image, sprite.rect)
+                if self.track_dirty:
+                    self._track(sprite)
+                # Debug hitboxów (opcjonalnie):
+                # if layer == Layer['Units']:
+                #     hitbox_surf = pygame.Surface((sprite.hitbox.width, sprite.hitbox.height))
+                #     hitbox_surf.fill('red')
+                #     self.display_surf.blit(hitbox_surf, sprite.hitbox)
+                # if layer == Layer['Positions']:
+                #     hitbox_surf = pygame.Surface((sprite.hitbox.width, sprite.hitbox.height))
+                #     hitbox_surf.fill('blue')
+                #     self.display_surf.blit(hitbox_surf, sprite.hitbox)
+                # if hasattr(sprite, 'hitbox_b'):
+                #     hitbox_b_surf = pygame.Surface((sprite.hitbox_b.width, sprite.hitbox_b.height))
+                #     hitbox_b_surf.fill('blue')
+                #     self.display_surf.blit(hitbox_b_surf, sprite.hitbox_b)
+        self._lost_rects.clear()
+
+        # Na końcu osobno rysujemy paski HP dla jednostek, żeby były na wierzchu (jednym blits)
+        bars = [bar for bar in map(self._hp_bar, units) if bar is not None]
+        self.display_surf.blits(bars, doreturn=False)
+
+    def draw_dirty(self, overlay_rects=()):
+        """Przerysuj tylko obszary zmienione od ostatniej klatki (ruch, animacja, HP, usunięte sprite'y)
+        oraz obszary nakładek rysowanych później (np. sklep). Zwraca prostokąty dla pygame.display.update."""
+        layers = self._draw_layers()
+
+        dirty = self._lost_rects + [pygame.Rect(rect) for rect in overlay_rects]
+        self._lost_rects = []
+        for _, sprites in layers:
+            for sprite in sprites:
+                prev_rect = self._track(sprite)
+                if prev_rect is not None:
+                    dirty.append(prev_rect)
+                    dirty.append(sprite.rect.copy())
+
+        # paski HP rysujemy w całości (przycięty obrys prostokąta rysuje się błędnie),
+        # więc pasek dotknięty przez brudny obszar dołącza do niego w całości
+        units = [sprite for layer, sprites in layers if layer == Layer['Units'] for sprite in sprites]
+        screen_rect = self.display_surf.get_rect()
+        bar_rects = [self._hp_bar_rect(sprite).clip(screen_rect) for sprite in units if hasattr(sprite, 'hp')]
+        merged = self._merge_rects(dirty)
+        grown = True
+        while grown:
+            grown = False
+            for bar in bar_rects:
+                if bar.collidelist(merged) != -1 and not any(rect.contains(bar) for rect in merged):
+                    merged = self._merge_rects(merged + [bar])
+                    grown = True
+        if not merged:
+            return []
+
+        for rect in merged:
+            self.display_surf.fill('black', rect)
+        for _, sprites in layers:
+            for sprite in sprites:
+                for i in sprite.rect.collidelistall(merged):
+                    clip = sprite.rect.clip(merged[i])
+                    self.display_surf.blit(sprite.image, clip, clip.move(-sprite.rect.x, -sprite.rect.y))
+
+        bars = [bar for bar in map(self._hp_bar, units) if bar is not None and bar[1].collidelist(merged) != -1]
+        self.display_surf.blits(bars, doreturn=False)
+        return merged
+
+    def _merge_rects(self, rects):
+        """Scal nachodzące na siebie prostokąty i przytnij je do ekranu"""
+        screen_rect = self.display_surf.get_rect()
+        merged = []
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect = rect.union(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
@@ -0,0 +1,745 @@
+"""Silnik walki bez pygame: czyste dane, bez okna i bez wczytywania obrazów.
+
+Unit i Projectile w units.py dziedziczą z CombatUnit / CombatProjectile, więc gra
+i symulacja bez grafiki (simulate) wykonują dokładnie tę samą logikę walki.
+"""
+import math
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
+
+from autochess.utils.paths import find_file, png_size
+from config.setting import BOARD_CENTER, BOARD_COLS, BOARD_ROWS, UNIT_STATS
+
+from .hex_layout import hex_center
+
+UNIT_ANIMATIONS = ('Idle', 'Run', 'Attack', 'Attack_down', 'Attack_up', 'Attack_downright', 'Attack_upright', 'Heal')
+
+# Limit ticków symulacji (np. same mnichy po obu stronach nigdy się nie atakują)
+MAX_TICKS = 20000
+
+# Bok komórki siatki przestrzennej w pikselach (mniej więcej jeden heks)
+SPATIAL_CELL_SIZE = 128
+# Poniżej tylu żywych jednostek liniowy przegląd listy jest szybszy niż siatka
+SPATIAL_MIN_UNITS = 96
+
+@lru_cache(maxsize=None)
+def unit_frame_counts(team, name):
+    """Liczba klatek każdej animacji jednostki, odczytana z nagłówków PNG (bez dekodowania obrazów)"""
+    pixel_size = 320 if name == 'lancer' else 192
+    counts = {}
+    for animation in UNIT_ANIMATIONS:
+        path = find_file(f'files/units/{team}_units/{name}/{animation}.png')
+        if path is None:
+            counts[animation] = 0
+            continue
+        width = png_size(path)[0]
+        # tak samo jak import_img: cały arkusz jako jedna klatka, jeśli nie jest szerszy niż klatka
+        counts[animation] = math.ceil(width / pixel_size) if width > pixel_size else 1
+    return MappingProxyType(counts)
+
+
+class CombatProjectile:
+    """Pocisk lecący do celu (strzała)"""
+
+    def __init__(self, start_pos, target, speed=8, damage=1, owner=None):
+        self.x, self.y = start_pos
+        self.target = target
+        self.target_generation = target.generation
+        self.speed = speed
+        self.damage = damage
+        self.owner = owner
+
+        self.dir_x = target.cx - self.x
+        self.dir_y = target.cy - self.y
+        length = math.sqrt(self.dir_x * self.dir_x + self.dir_y * self.dir_y)
+        if length > 0:
+            self.dir_x /= length
+            self.dir_y /= length
+        self.angle = math.degrees(math.atan2(-self.dir_y, self.dir_x))
+
+        self.hit = False
+        self.done = False
+
+    def update(self):
+        if self.hit or self.done:
+            return
+
+        if not self.target.alive or self.target.generation != self.target_generation:
+            self.done = True
+            return
+
+        dx = self.target.cx - self.x
+        dy = self.target.cy - self.y
+        distance = math.sqrt(dx * dx + dy * dy)
+
+        if distance > 0:
+            self.dir_x = dx / distance
+            self.dir_y = dy / distance
+            self.angle = math.degrees(math.atan2(-self.dir_y, self.dir_x))
+
+        self.x += self.dir_x * self.speed
+        self.y += self.dir_y * self.speed
+
+        if distance < 15:
+            self.hit = True
+            self.done = True
+            self.target.take_damage(self.damage, self.owner)
+
+
+class SpatialHash:
+    """Jednorodna siatka środków jednostek, osobno dla każdej drużyny.
+
+    Budowana raz na tick (rebuild); jednostka przesunięta w trakcie ticku zgłasza się
+    przez move(). Zapytania przeszukują kolejne pierścienie komórek (przycięte do
+    prostokąta zajętego przez szukane drużyny) i kończą, gdy dalsze komórki nie mogą
+    zawierać bliższej jednostki. Remisy rozstrzyga kolejność z rebuild, więc wynik
+    jest taki sam jak przy liniowym przeglądzie listy.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.teams = {}
+        self.bounds = {}
+        self.cell_of = {}
+        self.order = {}
+
+    def _cell(self, unit):
+        return unit.cx // self.cell_size, unit.cy // self.cell_size
+
+    def _insert(self, unit, cell):
+        self.teams.setdefault(unit.team, {}).setdefault(cell, []).append(unit)
+        self.cell_of[unit] = cell
+        gx, gy = cell
+        b = self.bounds.get(unit.team)
+        if b is None:
+            self.bounds[unit.team] = [gx, gy, gx, gy]
+        else:
+            b[0], b[1], b[2], b[3] = min(b[0], gx), min(b[1], gy), max(b[2], gx), max(b[3], gy)
+
+    def rebuild(self, units):
+        """Wstaw od nowa wszystkie jednostki (w kolejności listy)"""
+        self.teams = {}
+        self.bounds = {}
+        self.cell_of = {}
+        self.order = {}
+        for order, unit in enumerate(units):
+            self.order[unit] = order
+            self._insert(unit, self._cell(unit))
+
+    def move(self, unit):
+        """Przenieś jednostkę do nowej komórki po zmianie pozycji"""
+        old = self.cell_of.get(unit)
+        if old is None:
+            return
+        cell = self._cell(unit)
+        if cell != old:
+            self.teams[unit.team][old].remove(unit)
+            self._insert(unit, cell)
+
+    def nearest(self, unit, teams, wounded=False):
+        """Najbliższa żywa jednostka z podanych drużyn (albo None).
+        wounded=True pomija samą jednostkę i sojuszników z pełnym HP."""
+        teams = [team for team in teams if team in self.teams]
+        if not teams:
+            return None
+        grids = [self.teams[team] for team in teams]
+        min_x, min_y, max_x, max_y = self.bounds[teams[0]]
+        for team in teams[1:]:
+            b = self.bounds[team]
+            min_x, min_y, max_x, max_y = min(min_x, b[0]), min(min_y, b[1]), max(max_x, b[2]), max(max_y, b[3])
+
+        ux, uy = unit.cx, unit.cy
+        size = self.cell_size
+        gx, gy = ux // size, uy // size
+        first_ring = max(min_x - gx, gx - max_x, min_y - gy, gy - max_y, 0)
+        last_ring = max(gx - min_x, max_x - gx, gy - min_y, max_y - gy)
+        order = self.order
+        hypot = math.hypot
+
+        best = None
+        best_dist = float('inf')
+        best_order = 0
+        for ring in range(first_ring, last_ring + 1):
+            # komórki pierścienia (odległość Czebyszewa ring) przycięte do prostokąta drużyn
+            if ring == 0:
+                cells = [(gx, gy)]
+            else:
+                x0, x1 = max(gx - ring, min_x), min(gx + ring, max_x)
+                y0, y1 = max(gy - ring + 1, min_y), min(gy + ring - 1, max_y)
+                cells = [(x, y) for y in (gy - ring, gy + ring) if min_y <= y <= max_y for x in range(x0, x1 + 1)]
+                cells += [(x, y) for x in (gx - ring, gx + ring) if min_x <= x <= max_x for y in range(y0, y1 + 1)]
+            for cell in cells:
+                for grid in grids:
+                    for other in grid.get(cell, ()):
+                        if not other.alive:
+                            continue
+                        if wounded and (other is unit or other.hp >= other.type.max_hp):
+                            continue
+                        dist = hypot(ux - other.cx, uy - other.cy)
+                        if dist < best_dist or (dist == best_dist and order[other] < best_order):
+                            best, best_dist, best_order = other, dist, order[other]
+            # każda komórka w pierścieniu ring + 1 jest co najmniej ring * cell_size dalej
+            if best_dist < ring * size:
+                break
+        return best
+
+
+class UnitType:
+    """Niezmienny opis rodzaju jednostki: statystyki z UNIT_STATS i liczby klatek animacji.
+
+    Jeden obiekt na (drużyna, nazwa), współdzielony przez wszystkie jednostki tego rodzaju
+    (get_unit_type); jednostka trzyma tylko referencję w polu type. Drużyna należy do klucza,
+    bo arkusze, a więc i liczby klatek, są osobne dla każdej drużyny.
+    """
+
+    __slots__ = ('name', 'team', 'max_hp', 'damage', 'attack_range', 'attack_delay', 'speed', 'is_ranged',
+                 'projectile_speed', 'is_healer', 'heal_amount', 'heal_range', 'heal_delay', 'anim_speed',
+                 'attack_anim_speed', 'anim_frames')
+
+    def __init__(self, name, team, anim_frames=None):
+        stats = UNIT_STATS.get(name, UNIT_STATS['warrior'])
+        if anim_frames is None:
+            anim_frames = unit_frame_counts(team, name)
+        self._set(
+            name=name,
+            team=team,
+            max_hp=stats['hp'],
+            damage=stats['damage'],
+            attack_range=stats['attack_range'],
+            attack_delay=stats['attack_delay'],
+            speed=stats['speed'],
+            is_ranged=stats.get('is_ranged', False),
+            projectile_speed=stats.get('projectile_speed', 8),
+            is_healer=stats.get('is_healer', False),
+            heal_amount=stats.get('heal_amount', 1),
+            heal_range=stats.get('heal_range', 100),
+            heal_delay=stats.get('heal_delay', 90),
+            anim_speed=stats.get('anim_speed', 0.10),
+            attack_anim_speed=stats.get('attack_anim_speed', 0.10),
+            # liczba klatek każdej animacji - od niej zależy moment zadania obrażeń
+            anim_frames=MappingProxyType(dict(anim_frames)),
+        )
+
+    def _set(self, **fields):
+        # jedyna droga zapisu pól (także dla podklas), poza nią typ jest tylko do odczytu
+        for field, value in fields.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, field, value):
+        raise AttributeError(f'{type(self).__name__} jest tylko do odczytu ({field})')
+
+    def __delattr__(self, field):
+        raise AttributeError(f'{type(self).__name__} jest tylko do odczytu ({field})')
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.name!r}, {self.team!r})'
+
+
+@lru_cache(maxsize=None)
+def get_unit_type(team, name):
+    """Wspólny UnitType jednostek (team, name) dla walki bez grafiki"""
+    return UnitType(name, team)
+
+
+class CombatUnit:
+    """Stan i logika walki jednostki. Pozycja (x, y) to środek jednostki; (cx, cy) to środek w pikselach.
+
+    Statystyki siedzą we wspólnym UnitType (pole type); instancja trzyma w __slots__ tylko
+    zmienny stan walki. Gorące ścieżki czytają statystyki wprost z self.type.
+    """
+
+    __slots__ = ('type', 'name', 'team', 'generation', 'alive', 'engine', 'hp', 'index', 'facing_right',
+                 'direction', 'status', 'attack_cooldown', 'heal_cooldown', 'is_attacking', 'is_healing',
+                 'pending_shot', 'shot_target', 'shot_delay', 'pending_heal', 'heal_target', 'heal_action_delay',
+                 'target', 'damage_dealt', 'damage_taken', 'healing_done', 'kills', 'x', 'y', 'cx', 'cy')
+
+    # statystyki rodzaju jednostki (tylko do odczytu)
+    max_hp = property(attrgetter('type.max_hp'))
+    damage = property(attrgetter('type.damage'))
+    attack_range = property(attrgetter('type.attack_range'))
+    attack_delay = property(attrgetter('type.attack_delay'))
+    speed = property(attrgetter('type.speed'))
+    is_ranged = property(attrgetter('type.is_ranged'))
+    projectile_speed = property(attrgetter('type.projectile_speed'))
+    is_healer = property(attrgetter('type.is_healer'))
+    heal_amount = property(attrgetter('type.heal_amount'))
+    heal_range = property(attrgetter('type.heal_range'))
+    heal_delay = property(attrgetter('type.heal_delay'))
+    anim_speed = property(attrgetter('type.anim_speed'))
+    attack_anim_speed = property(attrgetter('type.attack_anim_speed'))
+    anim_frames = property(attrgetter('type.anim_frames'))
+
+    def __init__(self, name, team, pos, unit_type=None):
+        self.type = unit_type if unit_type is not None else get_unit_type(team, name)
+        # nazwa i drużyna także w slotach: czytane przy każdym wyszukiwaniu celu
+        self.name = name
+        self.team = team
+        # licznik wcieleń: rośnie przy każdym reset(), pociski celujące w poprzednie wcielenie przepadają
+        self.generation = 0
+        self.reset(pos)
+
+    def reset(self, pos):
+        """Stan jak po utworzeniu: pełne HP, pozycja pos, pierwsza klatka Idle, wyzerowane statystyki"""
+        self.generation += 1
+        self.alive = True
+        self.engine = None
+        self.hp = self.type.max_hp
+
+        self.index = 0
+        self.facing_right = True
+        self.direction = 'side'
+        self.reset_combat_state()
+
+        # statystyki walki
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.healing_done = 0
+        self.kills = 0
+
+        self.set_position(pos)
+
+    def set_position(self, pos):
+        """Ustaw środek jednostki"""
+        self.x, self.y = pos
+        self.cx, self.cy = int(self.x), int(self.y)
+
+    def moved(self):
+        """Wywoływane po zmianie pozycji w trakcie walki"""
+
+    def get_distance_to(self, other):
+        """Oblicz dystans do innej jednostki"""
+        return math.hypot(self.cx - other.cx, self.cy - other.cy)
+
+    def find_nearest_enemy(self, all_units, index=None):
+        """Znajdź najbliższego wroga"""
+        if index is not None:
+            enemies = [team for team in index.teams if team != self.team]
+            return index.nearest(self, enemies)
+
+        nearest = None
+        min_dist = float('inf')
+
+        for unit in all_units:
+            if not isinstance(unit, CombatUnit):
+                continue
+
+            if unit.team != self.team and unit.alive:
+                dist = self.get_distance_to(unit)
+                if dist < min_dist:
+                    min_dist = dist
+                    nearest = unit
+
+        return nearest
+
+    def find_wounded_ally(self, all_units, index=None):
+        """Znajdź najbliższego rannego sojusznika"""
+        if index is not None:
+            return index.nearest(self, (self.team,), wounded=True)
+
+        nearest = None
+        min_dist = float('inf')
+
+        for unit in all_units:
+            if not isinstance(unit, CombatUnit):
+                continue
+
+            if unit.team == self.team and unit.alive and unit != self:
+                if unit.hp < unit.type.max_hp:
+                    dist = self.get_distance_to(unit)
+                    if dist < min_dist:
+                        min_dist = dist
+                        nearest = unit
+
+        return nearest
+
+    def update_facing_direction(self, dx, dy):
+        """Aktualizuj kierunek patrzenia na podstawie ruchu"""
+        if abs(dx) > 0.1:
+            self.facing_right = dx > 0
+
+        angle = math.degrees(math.atan2(dy, abs(dx)))
+
+        if angle < -70:
+            self.direction = 'up'
+        elif angle < -35:
+            self.direction = 'up_side'
+        elif angle < 35:
+            self.direction = 'side'
+        elif angle < 70:
+            self.direction = 'down_side'
+        else:
+            self.direction = 'down'
+
+    def get_attack_animation(self):
+        """Pobierz odpowiednią animację ataku na podstawie kierunku"""
+        frames = self.type.anim_frames
+        if self.name == 'lancer':
+            if self.direction == 'up' and frames['Attack_up']:
+                return 'Attack_up'
+            elif self.direction == 'down' and frames['Attack_down']:
+                return 'Attack_down'
+            elif self.direction == 'up_side' and frames['Attack_upright']:
+                return 'Attack_upright'
+            elif self.direction == 'down_side' and frames['Attack_downright']:
+                return 'Attack_downright'
+            elif frames['Attack']:
+                return 'Attack'
+            elif frames['Attack_downright']:
+                return 'Attack_downright'
+            else:
+                return 'Attack_up'
+
+        if self.direction == 'up' and frames['Attack_up']:
+            return 'Attack_up'
+        elif self.direction == 'down' and frames['Attack_down']:
+            return 'Attack_down'
+        elif frames['Attack']:
+            return 'Attack'
+
+        return 'Idle'
+
+    def move_towards(self, target):
+        """Ruszaj w kierunku celu"""
+        if target is None:
+            return
+
+        dx = target.cx - self.cx
+        dy = target.cy - self.cy
+        dist = math.hypot(dx, dy)
+
+        if dist > 0:
+            self.update_facing_direction(dx, dy)
+
+            self.x += dx / dist * self.type.speed
+            self.y += dy / dist * self.type.speed
+
+            self.cx, self.cy = int(self.x), int(self.y)
+            self.moved()
+
+    def shoot_projectile(self, target):
+        """Wystrzel pocisk w kierunku celu"""
+        projectile = CombatProjectile((self.cx, self.cy), target, self.type.projectile_speed, self.type.damage, self)
+        if self.engine is not None:
+            self.engine.add_projectile(projectile)
+
+    def spawn_heal_effect(self, target):
+        """Efekt wizualny leczenia (tylko w grze)"""
+
+    def heal_landed(self, target, old_hp):
+        """Wywoływane, gdy opóźnione leczenie trafi w cel"""
+        self.spawn_heal_effect(target)
+
+    def attack(self, target):
+        """Zaatakuj cel"""
+        if self.is_attacking or self.is_healing or self.attack_cooldown > 0:
+            return
+        unit_type = self.type
+
+        dx = target.cx - self.cx
+        dy = target.cy - self.cy
+        self.update_facing_direction(dx, dy)
+
+        if unit_type.is_ranged:
+            self.pending_shot = True
+            self.shot_target = target
+            attack_anim = self.get_attack_animation()
+            anim_length = unit_type.anim_frames[attack_anim]
+            self.shot_delay = int(anim_length * 0.7 / unit_type.attack_anim_speed)
+        elif self.name == 'lancer':
+            self.pending_shot = True
+            self.shot_target = target
+            attack_anim = self.get_attack_animation()
+            anim_length = unit_type.anim_frames[attack_anim]
+            self.shot_delay = int(anim_length * 0.8 / unit_type.attack_anim_speed)
+        else:
+            target.take_damage(unit_type.damage, self)
+
+        self.attack_cooldown = unit_type.attack_delay
+        self.status = self.get_attack_animation()
+        self.index = 0
+        self.is_attacking = True
+
+    def heal(self, target):
+        """Ulecz sojusznika"""
+        if self.is_attacking or self.is_healing or self.heal_cooldown > 0:
+            return
+        unit_type = self.type
+
+        dx = target.cx - self.cx
+        dy = target.cy - self.cy
+        self.update_facing_direction(dx, dy)
+
+        self.pending_heal = True
+        self.heal_target = target
+
+        if unit_type.anim_frames['Heal']:
+            anim_length = unit_type.anim_frames['Heal']
+            self.heal_action_delay = int(anim_length * 0.5 / unit_type.anim_speed)
+            self.status = 'Heal'
+        else:
+            old_hp = target.hp
+            target.receive_heal(unit_type.heal_amount)
+            self.healing_done += target.hp - old_hp
+            self.spawn_heal_effect(target)
+            self.pending_heal = False
+
+        self.heal_cooldown = unit_type.heal_delay
+        self.index = 0
+        self.is_healing = True
+
+    def receive_heal(self, amount):
+        """Otrzymaj leczenie"""
+        self.hp = min(self.hp + amount, self.type.max_hp)
+
+    def take_damage(self, damage, source=None):
+        """Otrzymaj obrażenia"""
+        was_alive = self.alive
+        self.hp -= damage
+        self.damage_taken += damage
+        if source is not None:
+            source.damage_dealt += damage
+        if self.hp <= 0:
+            if was_alive and source is not None:
+                source.kills += 1
+            self.die()
+
+    def die(self):
+        """Jednostka ginie"""
+        self.alive = False
+
+    def animate(self):
+        """Przesuń animację i rozstrzygnij opóźnione strzały/leczenie.
+        Zwraca nazwę animacji, której klatkę index ma pokazać (None, gdy brak klatek)."""
+        unit_type = self.type
+        if 'Attack' in self.status:
+            current_speed = unit_type.attack_anim_speed
+        else:
+            current_speed = unit_type.anim_speed
+
+        self.index += current_speed
+
+        current_anim = self.status
+        anim_length = unit_type.anim_frames[current_anim]
+        if anim_length == 0:
+            current_anim = 'Idle'
+            anim_length = unit_type.anim_frames['Idle']
+            if anim_length == 0:
+                return None
+
+        if self.index >= anim_length:
+            self.index = 0
+            if 'Attack' in self.status:
+                self.status = 'Idle'
+                self.is_attacking = False
+            if self.status == 'Heal':
+                self.status = 'Idle'
+                self.is_healing = False
+
+        if self.pending_shot:
+            self.shot_delay -= 1
+            if self.shot_delay <= 0:
+                if self.shot_target and self.shot_target.alive:
+                    if unit_type.is_ranged:
+                        self.shoot_projectile(self.shot_target)
+                    else:
+                        self.shot_target.take_damage(unit_type.damage, self)
+                self.pending_shot = False
+                self.shot_target = None
+
+        if self.pending_heal:
+            self.heal_action_delay -= 1
+            if self.heal_action_delay <= 0:
+                if self.heal_target and self.heal_target.alive:
+                    old_hp = self.heal_target.hp
+                    self.heal_target.hp = min(self.heal_target.hp + unit_type.heal_amount, self.heal_target.type.max_hp)
+                    self.healing_done += self.heal_target.hp - old_hp
+                    self.heal_landed(self.heal_target, old_hp)
+                self.pending_heal = False
+                self.heal_target = None
+
+        return current_anim
+
+    def combat_update(self, all_units, index=None):
+        """Aktualizacja logiki walki. index (SpatialHash) zastępuje przegląd all_units."""
+        if not self.alive:
+            return
+        unit_type = self.type
+
+        if self.attack_cooldown > 0:
+            self.attack_cooldown -= 1
+
+        if self.heal_cooldown > 0:
+            self.heal_cooldown -= 1
+
+        if unit_type.is_healer:
+            wounded_ally = self.find_wounded_ally(all_units, index)
+
+            if wounded_ally:
+                dist = self.get_distance_to(wounded_ally)
+
+                if dist <= unit_type.heal_range:
+                    self.heal(wounded_ally)
+                else:
+                    if not self.is_healing:
+                        self.move_towards(wounded_ally)
+                        if index is not None:
+                            index.move(self)
+                        if unit_type.anim_frames['Run']:
+                            self.status = 'Run'
+                        else:
+                            self.status = 'Idle'
+            else:
+                if not self.is_healing:
+                    self.status = 'Idle'
+            return
+
+        self.target = self.find_nearest_enemy(all_units, index)
+
+        if self.target:
+            dist = self.get_distance_to(self.target)
+
+            if dist <= unit_type.attack_range:
+                self.attack(self.target)
+            else:
+                if not self.is_attacking:
+                    self.move_towards(self.target)
+                    if index is not None:
+                        index.move(self)
+                    if unit_type.anim_frames['Run']:
+                        self.status = 'Run'
+                    else:
+                        self.status = 'Idle'
+        else:
+            if not self.is_attacking:
+                self.status = 'Idle'
+
+    def reset_combat_state(self):
+        """Wyczyść flagi walki/animacji i cooldowny"""
+        self.status = 'Idle'
+        self.attack_cooldown = 0
+        self.heal_cooldown = 0
+        self.is_attacking = False
+        self.is_healing = False
+        self.pending_shot = False
+        self.shot_target = None
+        self.shot_delay = 0
+        self.pending_heal = False
+        self.heal_target = None
+        self.heal_action_delay = 0
+        self.target = None
+
+    def stats(self):
+        """Statystyki jednostki po walce"""
+        return {
+            'name': self.name,
+            'team': self.team,
+            'hp': self.hp,
+            'max_hp': self.max_hp,
+            'alive': self.alive,
+            'damage_dealt': self.damage_dealt,
+            'damage_taken': self.damage_taken,
+            'healing_done': self.healing_done,
+            'kills': self.kills,
+        }
+
+
+def combat_phase(units, index=None):
+    """Faza decyzji jednego ticku: każda żywa jednostka wybiera cel, rusza się lub atakuje.
+    Z indeksem (SpatialHash) i co najmniej SPATIAL_MIN_UNITS jednostkami cele wyszukiwane
+    są w siatce przebudowanej na początku ticku."""
+    alive = [u for u in units if u.alive]
+    if index is not None and len(alive) < SPATIAL_MIN_UNITS:
+        index = None
+    if index is not None:
+        index.rebuild(alive)
+    for unit in alive:
+        unit.combat_update(alive, index)
+
+
+class CombatEngine:
+    """Walka bez grafiki. Jeden step() odpowiada jednej klatce gry:
+    faza decyzji (HexGridManager.update_combat), potem animacje i pociski (all_sprites.update)."""
+
+    def __init__(self, units):
+        self.units = list(units)
+        # kolejność aktualizacji jak w grupie sprite'ów: jednostki, potem pociski w kolejności wystrzału
+        self.entities = list(self.units)
+        self.index = SpatialHash()
+        self.ticks = 0
+        for unit in self.units:
+            unit.engine = self
+
+    def add_projectile(self, projectile):
+        self.entities.append(projectile)
+
+    def alive_counts(self):
+        counts = {}
+        for unit in self.units:
+            counts.setdefault(unit.team, 0)
+            if unit.alive:
+                counts[unit.team] += 1
+        return counts
+
+    def step(self):
+        combat_phase(self.units, self.index)
+        for entity in list(self.entities):
+            if isinstance(entity, CombatUnit):
+                if entity.alive:
+                    entity.animate()
+            elif not entity.done:
+                entity.update()
+        self.entities = [e for e in self.entities if (e.alive if isinstance(e, CombatUnit) else not e.done)]
+        self.ticks += 1
+
+    def is_finished(self):
+        return sum(1 for count in self.alive_counts().values() if count > 0) <= 1
+
+    def run(self, max_ticks=MAX_TICKS):
+        """Prowadź walkę do końca (lub max_ticks) i zwróć wynik"""
+        while not self.is_finished() and self.ticks < max_ticks:
+            self.step()
+        return self.result()
+
+    def result(self):
+        survivors = self.alive_counts()
+        teams_alive = [team for team, count in survivors.items() if count > 0]
+        return {
+            'winner': teams_alive[0] if len(teams_alive) == 1 else None,
+            'ticks': self.ticks,
+            'survivors': survivors,
+            'units': [unit.stats() for unit in self.units],
+        }
+
+
+def wave_extras(round_num):
+    """Dodatkowi wrogowie dokładani w rundzie round_num (pozycje to środki w pikselach)"""
+    return [{'name': 'warrior', 'pos': (1100 - i * 60, 220 + (i % 2) * 80)} for i in range(max(0, round_num - 1))]
+
+
+def build_lineup(lineup, cols=BOARD_COLS, rows=BOARD_ROWS, center_pos=BOARD_CENTER):
+    """Zamień opis składu na jednostki. Każdy wpis to dict z 'name', 'team' oraz
+    'hex': (r, c) albo 'pos': (x, y) - środek jednostki w pikselach."""
+    units = []
+    for spec in lineup:
+        if 'hex' in spec:
+            r, c = spec['hex']
+            x, y = hex_center(r, c, cols, rows, center_pos)
+            pos = (round(x), round(y))
+        else:
+            pos = spec['pos']
+        units.append(CombatUnit(spec['name'], spec['team'], pos))
+    return units
+
+
+def simulate(lineup, max_ticks=MAX_TICKS, backend='python'):
+    """Rozegraj walkę bez okna i bez wczytywania obrazów. Zwraca dict z 'winner'
+    ('blue'/'red'/None przy remisie), 'ticks', 'survivors' i statystykami 'units'.
+    backend='numpy' używa wektorowego ArrayCombat (wymaga numpy) - dla dużych składów."""
+    units = build_lineup(lineup)
+    if backend == 'numpy':
+        from .combat_numpy import ArrayCombat
+        return ArrayCombat(units).run(max_ticks)
+    if backend != 'python':
+        raise ValueError(f'Nieznany backend walki: {backend}')
+    return CombatEngine(units).run(max_ticks)
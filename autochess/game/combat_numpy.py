@@ -0,0 +1,414 @@
+"""Wektorowy silnik walki (NumPy, struct-of-arrays) dla dużych plansz.
+
+Stan wszystkich jednostek trzymany jest w tablicach; cele wybiera macierz
+odległości z maskowanym argmin, a ruch, cooldowny i animacje liczone są hurtowo.
+Wyniki wracają do obiektów CombatUnit (np. sprite'ów Unit) dopiero w write_back().
+
+Zgodność z CombatEngine: faza decyzji idzie turami - każda tura to ciąg kolejnych
+jednostek jednej drużyny (dla składu z build_lineup: najpierw niebiescy, potem
+czerwoni) i widzi ruchy oraz trafienia wręcz z poprzednich tur, tak jak w silniku
+sekwencyjnym. Bez tego w pełni równoległa aktualizacja zachowywała symetrię
+lustrzanych składów: zamiast przewagi pierwszego ruchu wychodził odwrócony
+zwycięzca, remis przez wzajemne zabójstwa albo równowaga leczenia i ostrzału
+aż do MAX_TICKS. Różnice, które zostają:
+- w obrębie tury jednostki decydują na stanie z jej początku (uzdrowiciel idzie
+  do sojusznika, który w tym samym ticku jeszcze się przesunie), a przy remisie
+  odległości wygrywa niższy indeks, nie kolejność komórek SpatialHash,
+- opóźnione ciosy i strzały z fazy animacji rozstrzygane są naraz, więc jednostka
+  zabita w tej fazie może jeszcze oddać własny opóźniony strzał.
+Przebieg pojedynczej walki może więc się rozjechać (inna liczba ticków, czasem
+inny zwycięzca), ale odsetki zwycięstw z battle_runner zgadzają się z CombatEngine
+w granicach przedziału ufności. Remis na MAX_TICKS, gdy mnichy nadążają z leczeniem
+ostrzału, wynika z zasad gry i zdarza się w obu silnikach.
+"""
+import numpy as np
+
+from .combat import MAX_TICKS, UNIT_ANIMATIONS
+
+ANIM_CODES = {name: code for code, name in enumerate(UNIT_ANIMATIONS)}
+IDLE = ANIM_CODES['Idle']
+RUN = ANIM_CODES['Run']
+HEAL = ANIM_CODES['Heal']
+ATTACK_CODES = np.array([code for name, code in ANIM_CODES.items() if 'Attack' in name])
+
+DIRECTIONS = ('up', 'up_side', 'side', 'down_side', 'down')
+DIRECTION_BINS = np.array([-70.0, -35.0, 35.0, 70.0])
+
+HIT_DISTANCE = 15
+
+
+def _classify_direction(dx, dy):
+    """Kod kierunku (indeks w DIRECTIONS) jak w CombatUnit.update_facing_direction"""
+    angle = np.degrees(np.arctan2(dy, np.abs(dx)))
+    return np.digitize(angle, DIRECTION_BINS)
+
+
+class ArrayCombat:
+    """Walka na tablicach NumPy, z tym samym interfejsem co CombatEngine"""
+
+    def __init__(self, units):
+        self.units = list(units)
+        n = len(self.units)
+        units = self.units
+
+        self.teams = sorted({u.team for u in units})
+        self.team = np.array([self.teams.index(u.team) for u in units], dtype=np.int64)
+        # tury decyzji: kolejne ciągi jednostek jednej drużyny, w kolejności CombatEngine
+        starts = np.flatnonzero(np.diff(self.team)) + 1
+        self.turns = np.split(np.arange(n), starts)
+
+        def column(attr, dtype):
+            return np.array([getattr(u, attr) for u in units], dtype=dtype)
+
+        # statystyki
+        self.max_hp = column('max_hp', np.int64)
+        self.damage = column('damage', np.int64)
+        self.attack_range = column('attack_range', np.float64)
+        self.attack_delay = column('attack_delay', np.int64)
+        self.speed = column('speed', np.float64)
+        self.is_ranged = column('is_ranged', bool)
+        self.is_lancer = np.array([u.name == 'lancer' for u in units], dtype=bool)
+        self.projectile_speed = column('projectile_speed', np.float64)
+        self.is_healer = column('is_healer', bool)
+        self.heal_amount = column('heal_amount', np.int64)
+        self.heal_range = column('heal_range', np.float64)
+        self.heal_delay = column('heal_delay', np.int64)
+        self.anim_speed = column('anim_speed', np.float64)
+        self.attack_anim_speed = column('attack_anim_speed', np.float64)
+        self.frames = np.array([[u.anim_frames[a] for a in UNIT_ANIMATIONS] for u in units],
+                               dtype=np.int64).reshape(n, len(UNIT_ANIMATIONS))
+        self.attack_anim = np.array([self._attack_animations(u) for u in units],
+                                    dtype=np.int64).reshape(n, len(DIRECTIONS))
+
+        # stan walki
+        self.x = column('x', np.float64)
+        self.y = column('y', np.float64)
+        self.cx = column('cx', np.int64)
+        self.cy = column('cy', np.int64)
+        self.hp = column('hp', np.int64)
+        self.alive = column('alive', bool)
+        self.attack_cooldown = column('attack_cooldown', np.int64)
+        self.heal_cooldown = column('heal_cooldown', np.int64)
+        self.is_attacking = column('is_attacking', bool)
+        self.is_healing = column('is_healing', bool)
+        self.status = np.array([ANIM_CODES[u.status] for u in units], dtype=np.int64)
+        self.index = column('index', np.float64)
+        self.facing_right = column('facing_right', bool)
+        self.direction = np.array([DIRECTIONS.index(u.direction) for u in units], dtype=np.int64)
+        self.pending_shot = np.zeros(n, dtype=bool)
+        self.shot_target = np.full(n, -1, dtype=np.int64)
+        self.shot_delay = np.zeros(n, dtype=np.int64)
+        self.pending_heal = np.zeros(n, dtype=bool)
+        self.heal_target = np.full(n, -1, dtype=np.int64)
+        self.heal_action_delay = np.zeros(n, dtype=np.int64)
+
+        self.damage_dealt = column('damage_dealt', np.int64)
+        self.damage_taken = column('damage_taken', np.int64)
+        self.healing_done = column('healing_done', np.int64)
+        self.kills = column('kills', np.int64)
+
+        # pociski w locie
+        self.p_x = np.zeros(0)
+        self.p_y = np.zeros(0)
+        self.p_dir_x = np.zeros(0)
+        self.p_dir_y = np.zeros(0)
+        self.p_speed = np.zeros(0)
+        self.p_target = np.zeros(0, dtype=np.int64)
+        self.p_owner = np.zeros(0, dtype=np.int64)
+
+        self.ticks = 0
+        # stan z ostatniego write_back (wykrywanie ruchu i śmierci)
+        self._written_alive = self.alive.copy()
+
+    @staticmethod
+    def _attack_animations(unit):
+        """Kod animacji ataku dla każdego kierunku (get_attack_animation z danych jednostki)"""
+        direction = unit.direction
+        codes = []
+        for d in DIRECTIONS:
+            unit.direction = d
+            codes.append(ANIM_CODES[unit.get_attack_animation()])
+        unit.direction = direction
+        return codes
+
+    # --- pomocnicze ---
+    def _face(self, who, dx, dy):
+        turn = np.abs(dx) > 0.1
+        self.facing_right[who[turn]] = dx[turn] > 0
+        self.direction[who] = _classify_direction(dx, dy)
+
+    def _apply_damage(self, targets, amounts, sources):
+        if targets.size == 0:
+            return
+        was_alive = self.alive.copy()
+        np.subtract.at(self.hp, targets, amounts)
+        np.add.at(self.damage_taken, targets, amounts)
+        np.add.at(self.damage_dealt, sources, amounts)
+        died = was_alive & (self.hp <= 0)
+        for victim in np.flatnonzero(died):
+            # zabójstwo dla ostatniego trafienia w tej paczce
+            self.kills[sources[targets == victim][-1]] += 1
+        self.alive &= self.hp > 0
+
+    def _apply_heal(self, targets, sources):
+        for target, source in zip(targets, sources):
+            if not self.alive[target]:
+                continue
+            old_hp = self.hp[target]
+            self.hp[target] = min(old_hp + self.heal_amount[source], self.max_hp[target])
+            self.healing_done[source] += self.hp[target] - old_hp
+
+    def _spawn_projectiles(self, shooters, targets):
+        x = self.cx[shooters].astype(np.float64)
+        y = self.cy[shooters].astype(np.float64)
+        dx = self.cx[targets] - x
+        dy = self.cy[targets] - y
+        length = np.sqrt(dx * dx + dy * dy)
+        nz = length > 0
+        dx[nz] /= length[nz]
+        dy[nz] /= length[nz]
+        return x, y, dx, dy, self.projectile_speed[shooters], targets, shooters
+
+    # --- tick ---
+    def _decide(self):
+        """Faza decyzji: kolejne tury drużyn, każda widzi ruchy i trafienia poprzednich"""
+        for members in self.turns:
+            self._decide_turn(members)
+
+    def _decide_turn(self, members):
+        """Decyzje jednej tury: cele z macierzy odległości, atak / leczenie / ruch"""
+        alive = self.alive
+        idx = members[alive[members]]
+        if idx.size == 0:
+            return
+        self.attack_cooldown[idx[self.attack_cooldown[idx] > 0]] -= 1
+        self.heal_cooldown[idx[self.heal_cooldown[idx] > 0]] -= 1
+
+        # wiersze: jednostki tej tury, kolumny: wszystkie żywe (pozycje po poprzednich turach)
+        others = np.flatnonzero(alive)
+        dist = np.hypot(self.cx[others][None, :] - self.cx[idx][:, None],
+                        self.cy[others][None, :] - self.cy[idx][:, None])
+        same_team = self.team[idx][:, None] == self.team[others][None, :]
+        rows = np.arange(idx.size)
+
+        healer = self.is_healer[idx]
+        attacking = self.is_attacking[idx]
+        healing = self.is_healing[idx]
+
+        # wojownicy: najbliższy wróg
+        enemy_dist = np.where(same_team, np.inf, dist)
+        nearest = enemy_dist.argmin(axis=1)
+        enemy = others[nearest]
+        enemy_d = enemy_dist[rows, nearest]
+        has_enemy = ~healer & np.isfinite(enemy_d)
+        in_range = has_enemy & (enemy_d <= self.attack_range[idx])
+        attack = in_range & ~attacking & ~healing & (self.attack_cooldown[idx] <= 0)
+        chase = has_enemy & ~in_range & ~attacking
+        idle = ~healer & ~has_enemy & ~attacking
+
+        # uzdrowiciele: najbliższy ranny sojusznik
+        wounded = same_team & (self.hp[others] < self.max_hp[others])[None, :]
+        wounded &= others[None, :] != idx[:, None]
+        ally_dist = np.where(wounded, dist, np.inf)
+        nearest = ally_dist.argmin(axis=1)
+        ally = others[nearest]
+        ally_d = ally_dist[rows, nearest]
+        has_ally = healer & np.isfinite(ally_d)
+        in_heal = has_ally & (ally_d <= self.heal_range[idx])
+        heal = in_heal & ~attacking & ~healing & (self.heal_cooldown[idx] <= 0)
+        approach = has_ally & ~in_heal & ~healing
+        idle |= healer & ~has_ally & ~healing
+
+        self.status[idx[idle]] = IDLE
+
+        # ruch w stronę celu
+        movers = np.concatenate([idx[chase], idx[approach]])
+        if movers.size:
+            goals = np.concatenate([enemy[chase], ally[approach]])
+            dx = self.cx[goals] - self.cx[movers]
+            dy = self.cy[goals] - self.cy[movers]
+            d = np.hypot(dx, dy)
+            nz = d > 0
+            who, dx, dy, d = movers[nz], dx[nz], dy[nz], d[nz]
+            self._face(who, dx, dy)
+            self.x[who] += dx / d * self.speed[who]
+            self.y[who] += dy / d * self.speed[who]
+            self.cx[who] = np.trunc(self.x[who]).astype(np.int64)
+            self.cy[who] = np.trunc(self.y[who]).astype(np.int64)
+            self.status[movers] = np.where(self.frames[movers, RUN] > 0, RUN, IDLE)
+
+        # leczenie
+        healers = idx[heal]
+        if healers.size:
+            targets = ally[heal]
+            self._face(healers, self.cx[targets] - self.cx[healers], self.cy[targets] - self.cy[healers])
+            animated = self.frames[healers, HEAL] > 0
+            delayed = healers[animated]
+            self.pending_heal[delayed] = True
+            self.heal_target[delayed] = targets[animated]
+            self.heal_action_delay[delayed] = (self.frames[delayed, HEAL] * 0.5 / self.anim_speed[delayed]).astype(np.int64)
+            self.status[delayed] = HEAL
+            self._apply_heal(targets[~animated], healers[~animated])
+            self.heal_cooldown[healers] = self.heal_delay[healers]
+            self.index[healers] = 0
+            self.is_healing[healers] = True
+
+        # atak
+        attackers = idx[attack]
+        if attackers.size:
+            targets = enemy[attack]
+            self._face(attackers, self.cx[targets] - self.cx[attackers], self.cy[targets] - self.cy[attackers])
+            anim = self.attack_anim[attackers, self.direction[attackers]]
+            anim_length = self.frames[attackers, anim]
+            ranged = self.is_ranged[attackers]
+            delayed = ranged | self.is_lancer[attackers]
+            factor = np.where(ranged, 0.7, 0.8)
+            shooters = attackers[delayed]
+            self.pending_shot[shooters] = True
+            self.shot_target[shooters] = targets[delayed]
+            self.shot_delay[shooters] = (anim_length[delayed] * factor[delayed]
+                                         / self.attack_anim_speed[shooters]).astype(np.int64)
+            melee = attackers[~delayed]
+            self.attack_cooldown[attackers] = self.attack_delay[attackers]
+            self.status[attackers] = anim
+            self.index[attackers] = 0
+            self.is_attacking[attackers] = True
+            self._apply_damage(targets[~delayed], self.damage[melee], melee)
+
+    def _animate(self):
+        """Faza animacji: indeksy klatek, koniec ataku/leczenia, opóźnione strzały i leczenie"""
+        idx = np.flatnonzero(self.alive)
+        if idx.size == 0:
+            return None
+        status = self.status[idx]
+        attack_status = np.isin(status, ATTACK_CODES)
+        self.index[idx] += np.where(attack_status, self.attack_anim_speed[idx], self.anim_speed[idx])
+
+        length = self.frames[idx, status]
+        length = np.where(length == 0, self.frames[idx, IDLE], length)
+        # bez żadnych klatek animacja (i opóźnione akcje) stoi, jak w CombatUnit.animate
+        idx, status, attack_status, length = (a[length > 0] for a in (idx, status, attack_status, length))
+
+        wrap = self.index[idx] >= length
+        self.index[idx[wrap]] = 0
+        done_attack = idx[wrap & attack_status]
+        self.status[done_attack] = IDLE
+        self.is_attacking[done_attack] = False
+        done_heal = idx[wrap & (status == HEAL)]
+        self.status[done_heal] = IDLE
+        self.is_healing[done_heal] = False
+
+        new_projectiles = None
+        shooting = idx[self.pending_shot[idx]]
+        self.shot_delay[shooting] -= 1
+        fire = shooting[self.shot_delay[shooting] <= 0]
+        if fire.size:
+            targets = self.shot_target[fire]
+            hit = self.alive[targets]
+            fire, targets = fire[hit], targets[hit]
+            ranged = self.is_ranged[fire]
+            if ranged.any():
+                new_projectiles = self._spawn_projectiles(fire[ranged], targets[ranged])
+            self._apply_damage(targets[~ranged], self.damage[fire[~ranged]], fire[~ranged])
+        resolved = shooting[self.shot_delay[shooting] <= 0]
+        self.pending_shot[resolved] = False
+        self.shot_target[resolved] = -1
+
+        healing = idx[self.pending_heal[idx]]
+        self.heal_action_delay[healing] -= 1
+        land = healing[self.heal_action_delay[healing] <= 0]
+        if land.size:
+            self._apply_heal(self.heal_target[land], land)
+            self.pending_heal[land] = False
+            self.heal_target[land] = -1
+        return new_projectiles
+
+    def _update_projectiles(self):
+        """Ruch pocisków wystrzelonych w poprzednich tickach"""
+        if self.p_x.size == 0:
+            return
+        keep = self.alive[self.p_target]
+        dx = self.cx[self.p_target] - self.p_x
+        dy = self.cy[self.p_target] - self.p_y
+        dist = np.sqrt(dx * dx + dy * dy)
+        nz = keep & (dist > 0)
+        self.p_dir_x[nz] = dx[nz] / dist[nz]
+        self.p_dir_y[nz] = dy[nz] / dist[nz]
+        self.p_x += self.p_dir_x * self.p_speed
+        self.p_y += self.p_dir_y * self.p_speed
+
+        hit = keep & (dist < HIT_DISTANCE)
+        if hit.any():
+            owners = self.p_owner[hit]
+            self._apply_damage(self.p_target[hit], self.damage[owners], owners)
+        keep &= ~hit
+        self._keep_projectiles(keep)
+
+    def _keep_projectiles(self, keep):
+        self.p_x, self.p_y = self.p_x[keep], self.p_y[keep]
+        self.p_dir_x, self.p_dir_y = self.p_dir_x[keep], self.p_dir_y[keep]
+        self.p_speed, self.p_target, self.p_owner = self.p_speed[keep], self.p_target[keep], self.p_owner[keep]
+
+    def step(self):
+        self._decide()
+        new_projectiles = self._animate()
+        self._update_projectiles()
+        if new_projectiles is not None:
+            x, y, dir_x, dir_y, speed, target, owner = new_projectiles
+            self.p_x = np.concatenate([self.p_x, x])
+            self.p_y = np.concatenate([self.p_y, y])
+            self.p_dir_x = np.concatenate([self.p_dir_x, dir_x])
+            self.p_dir_y = np.concatenate([self.p_dir_y, dir_y])
+            self.p_speed = np.concatenate([self.p_speed, speed])
+            self.p_target = np.concatenate([self.p_target, target])
+            self.p_owner = np.concatenate([self.p_owner, owner])
+        self.ticks += 1
+
+    def alive_counts(self):
+        counts = np.bincount(self.team[self.alive], minlength=len(self.teams))
+        return {team: int(count) for team, count in zip(self.teams, counts)}
+
+    def is_finished(self):
+        return np.unique(self.team[self.alive]).size <= 1
+
+    def run(self, max_ticks=MAX_TICKS):
+        """Prowadź walkę do końca (lub max_ticks) i zwróć wynik"""
+        while not self.is_finished() and self.ticks < max_ticks:
+            self.step()
+        return self.result()
+
+    def write_back(self):
+        """Przepisz stan z tablic do obiektów jednostek (dla sprite'ów: pozycja rect i śmierć)"""
+        for i, unit in enumerate(self.units):
+            moved = unit.cx != self.cx[i] or unit.cy != self.cy[i]
+            unit.x, unit.y = float(self.x[i]), float(self.y[i])
+            unit.cx, unit.cy = int(self.cx[i]), int(self.cy[i])
+            unit.hp = int(self.hp[i])
+            unit.status = UNIT_ANIMATIONS[self.status[i]]
+            unit.index = float(self.index[i])
+            unit.facing_right = bool(self.facing_right[i])
+            unit.direction = DIRECTIONS[self.direction[i]]
+            unit.attack_cooldown = int(self.attack_cooldown[i])
+            unit.heal_cooldown = int(self.heal_cooldown[i])
+            unit.is_attacking = bool(self.is_attacking[i])
+            unit.is_healing = bool(self.is_healing[i])
+            unit.damage_dealt = int(self.damage_dealt[i])
+            unit.damage_taken = int(self.damage_taken[i])
+            unit.healing_done = int(self.healing_done[i])
+            unit.kills = int(self.kills[i])
+            if moved:
+                unit.moved()
+            if self._written_alive[i] and not self.alive[i]:
+                unit.die()
+        self._written_alive = self.alive.copy()
+
+    def result(self):
+        self.write_back()
+        survivors = self.alive_counts()
+        teams_alive = [team for team, count in survivors.items() if count > 0]
+        return {
+            'winner': teams_alive[0] if len(teams_alive) == 1 else None,
+            'ticks': self.ticks,
+            'survivors': survivors,
+            'units': [unit.stats() for unit in self.units],
+        }
@@ -1,9 +1,13 @@
 import math
+from functools import lru_cache
 
 import pygame
 
-HEX_RADIUS = 64
-HEX_MARGIN = 5
+from autochess.utils.profiler import profiler
+
+from .combat import SpatialHash, combat_phase
+from .hex_layout import HEX_RADIUS, hex_center, pixel_to_hex
+
 ANIMATION_SPEED = 0.05
 WAVE_SPEED = 10
 HEX_COLOR = (128, 128, 128, 100)
@@ -12,6 +16,22 @@ HEX_BORDER_COLOR = (64, 64, 64)
 DRAG_FREE_COLOR = (128, 128, 128, 100)
 DRAG_OCCUPIED_COLOR = (64, 64, 64, 150)
 
+@lru_cache(maxsize=None)
+def get_hex_image(radius, step, color):
+    """Zwróć heks narysowany w skali step * ANIMATION_SPEED, rasteryzowany raz na proces"""
+    size = int(radius * 2.2)
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    scale = step * ANIMATION_SPEED
+    if scale > 0.01:
+        points = []
+        for i in range(6):
+            angle_rad = math.radians(60 * i - 30)
+            points.append((size / 2 + radius * math.cos(angle_rad) * scale,
+                           size / 2 + radius * math.sin(angle_rad) * scale))
+        pygame.draw.polygon(image, color, points)
+        pygame.draw.polygon(image, HEX_BORDER_COLOR, points, 3)
+    return image
+
 
 class HexSprite(pygame.sprite.Sprite):
     """Pojedynczy heks na planszy"""
@@ -28,26 +48,14 @@ class HexSprite(pygame.sprite.Sprite):
         self.active = False
         self.dist_from_center = 0
         self.shrinking = False
+        self.dirty = 1  # obrazek podmieniony -> do przerysowania w trybie dirty-rect
 
-        size = int(radius * 2.2)
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        # obrazek ze wspólnego cache: klucz (krok skali, kolor) ostatnio pokazanej klatki
+        self._image_key = (0, HEX_COLOR)
+        self.image = get_hex_image(radius, 0, HEX_COLOR)
         self.rect = self.image.get_rect(center=(x, y))
         self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.5, -self.rect.height * 0.5)
 
-        self.center_offset = (size / 2, size / 2)
-        self.base_points = self._compute_vertices()
-
-    def _compute_vertices(self):
-        """Oblicz wierzchołki heksa"""
-        points = []
-        for i in range(6):
-            angle_deg = 60 * i - 30
-            angle_rad = math.radians(angle_deg)
-            px = self.radius * math.cos(angle_rad)
-            py = self.radius * math.sin(angle_rad)
-            points.append((px, py))
-        return points
-
     def activate(self):
         """Aktywuj heks"""
         self.active = True
@@ -76,27 +84,17 @@ class HexSprite(pygame.sprite.Sprite):
                 if self.scale > 1.0:
                     self.scale = 1.0
                 scale_changed = True
-        # Force redraw if scale changed OR an overlay is currently applied
-        if scale_changed or self.dynamic_color is not None:
+        if scale_changed:
             self.redraw()
 
     def redraw(self):
-        """Przerysuj heks"""
-        self.image.fill((0, 0, 0, 0))
-
-        if self.scale <= 0.01:
+        """Podmień obrazek na klatkę z cache dla bieżącej skali i koloru (bez rysowania)"""
+        key = (round(self.scale / ANIMATION_SPEED), self.dynamic_color if self.dynamic_color else HEX_COLOR)
+        if key == self._image_key:
             return
-
-        cx, cy = self.center_offset
-        current_points = []
-        for (ox, oy) in self.base_points:
-            nx = cx + (ox * self.scale)
-            ny = cy + (oy * self.scale)
-            current_points.append((nx, ny))
-
-        base_color = self.dynamic_color if self.dynamic_color else HEX_COLOR
-        pygame.draw.polygon(self.image, base_color, current_points)
-        pygame.draw.polygon(self.image, HEX_BORDER_COLOR, current_points, 3)
+        self._image_key = key
+        self.image = get_hex_image(self.radius, *key)
+        self.dirty = 1
 
 
 class HexGridManager:
@@ -109,8 +107,15 @@ class HexGridManager:
         self.group = group
         self.layer = layer
         self.hexes = []
+        # tablice po (r, c): hex_grid[r][c] -> HexSprite, hex_centers[r][c] -> środek (rect.center)
+        self.hex_grid = []
+        self.hex_centers = []
+        # (r, c) -> HexSprite
+        self.hex_by_key = {}
         self.units = units
         self.selected_unit = None
+        # siatka przestrzenna jednostek do wyszukiwania celów w walce
+        self.unit_index = SpatialHash()
 
         self.wave_radius = 0
         self.max_dist = 0
@@ -120,8 +125,9 @@ class HexGridManager:
         self.shrink_wave_radius = 0
         self.shrinking_started = False
         self.grid_fully_hidden = False
-        # occupancy map: (r,c) -> Unit or None
+        # occupancy map: (r,c) -> Unit or None, and the reverse: Unit -> (r,c)
         self.occupancy = {}
+        self.unit_cells = {}
         # previous position for dragged unit to revert if drop invalid
         self._drag_prev_center = None
         # previous hex key to revert precisely back to original hex
@@ -129,27 +135,15 @@ class HexGridManager:
 
     def generate(self):
         """Generuj siatkę heksów"""
-        step_x = math.sqrt(3) * HEX_RADIUS + HEX_MARGIN
-        step_y = HEX_RADIUS * 1.5 + HEX_MARGIN
-
-        total_w = self.cols * step_x + (step_x / 2 if self.rows % 2 != 0 else 0) - HEX_MARGIN
-        total_h = self.rows * step_y + HEX_RADIUS
-
-        start_x = self.center_pos[0] - (total_w / 2)
-        start_y = self.center_pos[1] - (total_h / 2)
-
         for r in range(self.rows):
+            self.hex_grid.append([])
+            self.hex_centers.append([])
             for c in range(self.cols):
-                h_width = math.sqrt(3) * HEX_RADIUS
-                h_height = 2 * HEX_RADIUS
-
-                x_base = c * (h_width + HEX_MARGIN)
-                x_offset = (h_width / 2 + HEX_MARGIN / 2) if r % 2 == 1 else 0
-
-                pos_x = start_x + x_base + x_offset
-                pos_y = start_y + (r * (h_height * 0.75 + HEX_MARGIN)) + HEX_RADIUS
+                pos_x, pos_y = hex_center(r, c, self.cols, self.rows, self.center_pos)
 
                 hex_sprite = HexSprite(r, c, pos_x, pos_y, HEX_RADIUS, [self.group], self.layer)
+                self.hex_grid[r].append(hex_sprite)
+                self.hex_centers[r].append(hex_sprite.rect.center)
 
                 dist = math.hypot(pos_x - self.center_pos[0], pos_y - self.center_pos[1])
                 hex_sprite.dist_from_center = dist
@@ -157,6 +151,7 @@ class HexGridManager:
                     self.max_dist = dist
 
                 self.hexes.append(hex_sprite)
+                self.hex_by_key[(r, c)] = hex_sprite
                 self.occupancy[(r, c)] = None
 
         self.generated = True
@@ -184,8 +179,9 @@ class HexGridManager:
     # --- Occupancy helpers ---
     def initialize_occupancy(self):
         """Assign current units to nearest hex centers to seed occupancy."""
-        for key in list(self.occupancy.keys()):
+        for key in self.occupancy:
             self.occupancy[key] = None
+        self.unit_cells.clear()
         for u in self.units:
             hc = self.find_nearest_hex_center(u.rect.center)
             if hc:
@@ -193,19 +189,41 @@ class HexGridManager:
                 key = (h.r, h.c)
                 if self.occupancy.get(key) is None:
                     self.occupancy[key] = u
+                    self.unit_cells[u] = key
                     u.rect.center = h.rect.center
                     if hasattr(u, 'sync_pos_from_rect'):
                         u.sync_pos_from_rect()
+                    u.hitbox = u.rect.copy().inflate(-u.rect.width * 0.7, -u.rect.height * 0.7)
 
     def find_nearest_hex_center(self, pos):
-        """Return dict with hex and distance to its center for given screen pos."""
-        best = None
+        """Return dict with hex and distance to its center for given screen pos.
+        Constant time: pixel_to_hex gives the approximate cell, its 3x3 neighbourhood is checked
+        (same result and tie order as scanning every hex)."""
+        if not self.hex_grid:
+            return None
         bx, by = pos
-        for h in self.hexes:
-            d = math.hypot(h.rect.centerx - bx, h.rect.centery - by)
-            if best is None or d < best['dist']:
-                best = {'hex': h, 'dist': d}
-        return best
+        r0, c0 = pixel_to_hex(bx, by, self.cols, self.rows, self.center_pos)
+        best = None
+        best_d = None
+        for r in range(max(0, r0 - 1), min(self.rows, r0 + 2)):
+            centers = self.hex_centers[r]
+            for c in range(max(0, c0 - 1), min(self.cols, c0 + 2)):
+                cx, cy = centers[c]
+                d = math.hypot(cx - bx, cy - by)
+                if best_d is None or d < best_d:
+                    best = (r, c)
+                    best_d = d
+        return {'hex': self.hex_grid[best[0]][best[1]], 'dist': best_d}
+
+    def cell_of(self, unit):
+        """(r, c) of the hex the unit occupies, or None."""
+        return self.unit_cells.get(unit)
+
+    def release_unit(self, unit):
+        """Free the hex held by the unit (no-op if it holds none)."""
+        key = self.unit_cells.pop(unit, None)
+        if key is not None and self.occupancy.get(key) is unit:
+            self.occupancy[key] = None
 
     def is_hex_free(self, hex_sprite):
         return self.occupancy.get((hex_sprite.r, hex_sprite.c)) is None
@@ -213,12 +231,11 @@ class HexGridManager:
     def assign_unit_to_hex(self, unit, hex_sprite):
         key = (hex_sprite.r, hex_sprite.c)
         # clear any previous assignment of this unit
-        for k, v in self.occupancy.items():
-            if v is unit:
-                self.occupancy[k] = None
+        self.release_unit(unit)
         # set new if free
         if self.occupancy.get(key) is None:
             self.occupancy[key] = unit
+            self.unit_cells[unit] = key
             unit.rect.center = hex_sprite.rect.center
             if hasattr(unit, 'sync_pos_from_rect'):
                 unit.sync_pos_from_rect()
@@ -243,8 +260,7 @@ class HexGridManager:
         if all_shrunk and not self.grid_fully_hidden:
             self.grid_fully_hidden = True
             for unit in self.units:
-                unit.pos.x = unit.rect.centerx
-                unit.pos.y = unit.rect.centery
+                unit.sync_pos_from_rect()
 
     def collision(self):
         """Obsługa przeciągania jednostek"""
@@ -263,11 +279,7 @@ class HexGridManager:
                     self.selected_unit = sprite
                     self._drag_prev_center = sprite.rect.center
                     # Remember which hex the unit currently occupies
-                    self._drag_prev_hex_key = None
-                    for k, v in self.occupancy.items():
-                        if v is sprite:
-                            self._drag_prev_hex_key = k
-                            break
+                    self._drag_prev_hex_key = self.unit_cells.get(sprite)
                     # apply color overrides: occupied vs free
                     for h in self.hexes:
                         if self.is_hex_free(h) or self.occupancy.get((h.r, h.c)) is sprite:
@@ -297,15 +309,13 @@ class HexGridManager:
             if not placed and self._drag_prev_center:
                 # revert to original hex center if known
                 revert_center = self._drag_prev_center
-                if self._drag_prev_hex_key is not None:
-                    r, c = self._drag_prev_hex_key
-                    for hx in self.hexes:
-                        if hx.r == r and hx.c == c:
-                            revert_center = hx.rect.center
-                            break
+                prev_hex = self.hex_by_key.get(self._drag_prev_hex_key)
+                if prev_hex is not None:
+                    revert_center = prev_hex.rect.center
                 self.selected_unit.rect.center = revert_center
                 if hasattr(self.selected_unit, 'sync_pos_from_rect'):
                     self.selected_unit.sync_pos_from_rect()
+                # the unit still holds its hex (a failed drop never reassigns it), only rect and hitbox go back
                 self.selected_unit.hitbox = self.selected_unit.rect.copy().inflate(
                     -self.selected_unit.rect.width * 0.7, -self.selected_unit.rect.height * 0.7)
             # clear drag state and color overrides
@@ -317,8 +327,16 @@ class HexGridManager:
             self._drag_prev_center = None
             self._drag_prev_hex_key = None
 
+    def snap_unit(self, unit):
+        """Przyciągnij jednostkę do środka najbliższego heksa (jeśli wolny); zwraca True po przypisaniu"""
+        nearest = self.find_nearest_hex_center(unit.rect.center)
+        if nearest:
+            return self.assign_unit_to_hex(unit, nearest['hex'])
+        return False
+
     def set_the_center(self):
-        """Przyciągaj jednostki do środka heksów"""
+        """Przyciągnij wszystkie jednostki do środka heksów (po ręcznym przesunięciu jednostek).
+        update() nie robi tego co klatkę: spawn, upuszczenie i resety rundy same przypisują heksy."""
         if self.combat_mode:
             return
 
@@ -327,21 +345,16 @@ class HexGridManager:
                 continue
             # Only snap when not dragging
             if self.selected_unit is None:
-                nearest = self.find_nearest_hex_center(sprite.rect.center)
-                if nearest:
-                    h = nearest['hex']
-                    self.assign_unit_to_hex(sprite, h)
+                self.snap_unit(sprite)
 
     def update_combat(self):
         """Aktualizuj logikę walki dla wszystkich jednostek"""
         if not self.combat_mode or not self.grid_fully_hidden:
             return
 
-        from autochess.game.units import Unit
-        all_units = [u for u in self.units if isinstance(u, Unit) and u.alive]
-
-        for unit in all_units:
-            unit.combat_update(all_units)
+        profiler.begin('combat')
+        combat_phase(self.units, self.unit_index)
+        profiler.end()
 
     # placement used by spawners to ensure one unit per hex
     def place_unit_on_free_hex(self, unit, prefer_top=True):
@@ -373,5 +386,4 @@ class HexGridManager:
 
         self.update_shrink_animation()
         self.collision()
-        self.set_the_center()
         self.update_combat()
\ No newline at end of file
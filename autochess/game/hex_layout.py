@@ -0,0 +1,44 @@
+import math
+
+HEX_RADIUS = 64
+HEX_MARGIN = 5
+
+
+def hex_center(r, c, cols, rows, center_pos):
+    """Pozycja środka heksa (r, c) na planszy cols x rows wyśrodkowanej w center_pos"""
+    step_x = math.sqrt(3) * HEX_RADIUS + HEX_MARGIN
+    step_y = HEX_RADIUS * 1.5 + HEX_MARGIN
+
+    total_w = cols * step_x + (step_x / 2 if rows % 2 != 0 else 0) - HEX_MARGIN
+    total_h = rows * step_y + HEX_RADIUS
+
+    start_x = center_pos[0] - (total_w / 2)
+    start_y = center_pos[1] - (total_h / 2)
+
+    h_width = math.sqrt(3) * HEX_RADIUS
+    h_height = 2 * HEX_RADIUS
+
+    x_base = c * (h_width + HEX_MARGIN)
+    x_offset = (h_width / 2 + HEX_MARGIN / 2) if r % 2 == 1 else 0
+
+    pos_x = start_x + x_base + x_offset
+    pos_y = start_y + (r * (h_height * 0.75 + HEX_MARGIN)) + HEX_RADIUS
+    return pos_x, pos_y
+
+
+def pixel_to_hex(x, y, cols, rows, center_pos):
+    """Odwrotność hex_center: (r, c) heksa, w którego pobliżu leży punkt (x, y), przycięte do planszy.
+    Wynik jest przybliżony przy krawędziach heksów - dokładny najbliższy heks leży w (r±1, c±1)."""
+    step_x = math.sqrt(3) * HEX_RADIUS + HEX_MARGIN
+    step_y = HEX_RADIUS * 1.5 + HEX_MARGIN
+
+    total_w = cols * step_x + (step_x / 2 if rows % 2 != 0 else 0) - HEX_MARGIN
+    total_h = rows * step_y + HEX_RADIUS
+
+    start_x = center_pos[0] - (total_w / 2)
+    start_y = center_pos[1] - (total_h / 2)
+
+    r = min(rows - 1, max(0, round((y - start_y - HEX_RADIUS) / step_y)))
+    x_offset = step_x / 2 if r % 2 == 1 else 0
+    c = min(cols - 1, max(0, round((x - start_x - x_offset) / step_x)))
+    return r, c
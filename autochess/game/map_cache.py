@@ -0,0 +1,255 @@
+"""Skompilowana mapa: map.tmx sparsowany raz i zapisany na dysku razem z pikselami kafelków.
+
+Plik cache zawiera rozmieszczenie kafelków warstw statycznych, pozycje obiektów,
+pozycje animowanych dekoracji oraz pocięte arkusze (owce, drzewa, kamienie, krzaki)
+jako surowe bajty RGBA. Nagłówek pliku trzyma listę plików źródłowych (tmx, tsx, png)
+z ich mtime i rozmiarem - gdy któryś się zmieni, cache jest budowany od nowa.
+Ciepły start nie parsuje więc XML-a ani nie dekoduje żadnego PNG z mapy.
+
+Format pliku: MAP_CACHE_MAGIC, nagłówek JSON, opis mapy JSON (każdy poprzedzony długością
+jako uint32 little-endian), a za nimi same piksele obrazków w kolejności z opisu. Nic z pliku
+nie jest wykonywane - uszkodzony lub podmieniony plik kończy się najwyżej ponowną kompilacją.
+
+Poza cache na dysku load_map pamięta wynik w _loaded_maps do końca procesu: klatki arkuszy
+trafiają do wspólnego atlasu, więc kolejna plansza (nowa gra po powrocie do menu) dostaje
+te same klatki zamiast pakować je drugi raz. Kto mierzy samo wczytywanie mapy (benchmark,
+testy), musi ten słownik wyczyścić.
+"""
+import glob
+import json
+import os
+import struct
+
+import pygame
+
+from autochess.utils.assets import load_tmx
+from autochess.utils.atlas import atlas
+from autochess.utils.config import import_img, import_img_two_diff_sizes
+from autochess.utils.paths import find_file
+from config.setting import MAP_CACHE_DIR
+
+# Zmiana formatu pliku lub sposobu budowania unieważnia stare pliki cache
+MAP_CACHE_VERSION = 2
+MAP_CACHE_MAGIC = b'MAPC'
+
+# Warstwy kafelków i obiektów pieczone w statyczne tło
+TILE_LAYERS = ('Area', 'Decoration', 'Decoration2', 'Background2', 'Background')
+OBJECT_LAYERS = ('ObjectsDecorations',)
+# Warstwy animowanych dekoracji: warstwa -> warianty arkuszy (plik, szerokość klatki, wysokość klatki)
+SHEET_LAYERS = {
+    'Sheep': (('Sheep_Idle', 128, 128),),
+    'Tree': (('Tree1', 192, 256), ('Tree2', 192, 256), ('Tree3', 192, 192), ('Tree4', 192, 192)),
+    'Rock': tuple((f'Water Rocks_0{i}', 64, 64) for i in range(1, 5)),
+    'Bushes': tuple((f'Bushe{i}', 128, 128) for i in range(1, 5)),
+}
+SHEET_DIR = 'files/tiles'
+
+# Mapy wczytane w tym procesie: ścieżka tmx -> wynik load_map (klatki siedzą w atlasie, więc tylko raz)
+_loaded_maps = {}
+
+
+def _cache_path(tmx_path):
+    name = os.path.splitext(os.path.basename(tmx_path))[0]
+    return os.path.join(MAP_CACHE_DIR, f'{name}.mapc')
+
+
+def _stamp(paths):
+    """(ścieżka, mtime_ns, rozmiar) każdego pliku źródłowego; None gdy któregoś brakuje"""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamps.append([path, st.st_mtime_ns, st.st_size])
+    return stamps
+
+
+def _header_ok(header):
+    if not isinstance(header, dict) or header.get('version') != MAP_CACHE_VERSION:
+        return False
+    if header.get('layers') != repr((TILE_LAYERS, OBJECT_LAYERS, SHEET_LAYERS)):
+        return False
+    sources = header.get('sources') or []
+    return _stamp([path for path, _, _ in sources]) == sources
+
+
+def _read_json(f):
+    length, = struct.unpack('<I', f.read(4))
+    return json.loads(f.read(length).decode('utf-8'))
+
+
+def _read_header(f):
+    if f.read(len(MAP_CACHE_MAGIC)) != MAP_CACHE_MAGIC:
+        return None
+    return _read_json(f)
+
+
+def is_fresh(tmx_path):
+    """Czy plik cache mapy istnieje i odpowiada aktualnym plikom źródłowym (czyta tylko nagłówek)"""
+    try:
+        with open(_cache_path(tmx_path), 'rb') as f:
+            return _header_ok(_read_header(f))
+    except Exception:
+        return False
+
+
+def _to_blob(surf):
+    # kafelki bez kanału alfa (smart_convert pytmx robi z nich convert()) albo z colorkey najpierw
+    # dostają kanał alfa, żeby zapis RGBA dał te same piksele, które by narysowały
+    if not surf.get_flags() & pygame.SRCALPHA or surf.get_colorkey() is not None:
+        surf = surf.convert_alpha()
+    return surf.get_size(), pygame.image.tobytes(surf, 'RGBA')
+
+
+def _from_blob(blob):
+    size, data = blob
+    return pygame.image.frombuffer(data, size, 'RGBA').convert_alpha()
+
+
+def compile_map(tmx_path):
+    """Sparsuj mapę i pokrój arkusze; zwraca (nagłówek, dane) gotowe do zapisu"""
+    tmx_path = find_file(tmx_path) or tmx_path
+    loaded = []
+    tmx_data = load_tmx(tmx_path, sources=loaded)
+
+    images = []
+    image_ids = {}
+
+    def image_index(surf):
+        index = image_ids.get(id(surf))
+        if index is None:
+            index = image_ids[id(surf)] = len(images)
+            images.append(_to_blob(surf))
+        return index
+
+    static = []
+    placements = []
+    for layer in tmx_data.layernames:
+        if layer in TILE_LAYERS:
+            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
+                static.append((layer, image_index(surf), (x * tmx_data.tilewidth, y * tmx_data.tileheight)))
+        if layer in OBJECT_LAYERS:
+            for obj in tmx_data.get_layer_by_name(layer):
+                static.append((layer, image_index(obj.image), (obj.x, obj.y)))
+        if layer in SHEET_LAYERS:
+            cells = [(x, y) for x, y, _ in tmx_data.get_layer_by_name(layer).tiles()]
+            placements.append((layer, cells))
+
+    sheets = {}
+    for variants in SHEET_LAYERS.values():
+        for name, width, height in variants:
+            path = find_file(f'{SHEET_DIR}/{name}.png')
+            if path is None:
+                continue
+            loaded.append(path)
+            if width == height:
+                surfs = import_img(path, width)
+            else:
+                surfs = import_img_two_diff_sizes(path, width, height)
+            sheets[name] = [_to_blob(surf) for surf in surfs]
+
+    map_dir = os.path.dirname(tmx_path)
+    sources = [tmx_path] + sorted(glob.glob(os.path.join(map_dir, '*.tsx')))
+    sources += sorted({os.path.normpath(path) for path in loaded})
+    header = {
+        'version': MAP_CACHE_VERSION,
+        'layers': repr((TILE_LAYERS, OBJECT_LAYERS, SHEET_LAYERS)),
+        'sources': _stamp(sources) or [],
+    }
+    data = {
+        'tile_size': (tmx_data.tilewidth, tmx_data.tileheight),
+        'images': images,
+        'static': static,
+        'placements': placements,
+        'sheets': sheets,
+    }
+    return header, data
+
+
+def _write(path, header, data):
+    # zapis do pliku tymczasowego i podmiana, żeby przerwany zapis nie zostawił uszkodzonego cache
+    blobs = data['images'] + [blob for blobs in data['sheets'].values() for blob in blobs]
+    layout = {
+        'tile_size': data['tile_size'],
+        'images': [size for size, _ in data['images']],
+        'static': data['static'],
+        'placements': data['placements'],
+        'sheets': {name: [size for size, _ in blobs] for name, blobs in data['sheets'].items()},
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MAP_CACHE_MAGIC)
+            for part in (header, layout):
+                encoded = json.dumps(part).encode('utf-8')
+                f.write(struct.pack('<I', len(encoded)))
+                f.write(encoded)
+            for _, pixels in blobs:
+                f.write(pixels)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # brak zapisu (np. katalog tylko do odczytu) - mapa będzie kompilowana przy każdym starcie
+
+
+def _read(path):
+    """Dane w postaci zwracanej przez compile_map albo None (brak pliku, nieaktualny lub uszkodzony)"""
+    try:
+        with open(path, 'rb') as f:
+            if not _header_ok(_read_header(f)):
+                return None
+            layout = _read_json(f)
+            pixels = f.read()
+
+        offset = 0
+
+        def blobs(sizes):
+            nonlocal offset
+            result = []
+            for w, h in sizes:
+                end = offset + w * h * 4
+                if end > len(pixels):
+                    raise ValueError('za mało pikseli w pliku cache')
+                result.append(((w, h), pixels[offset:end]))
+                offset = end
+            return result
+
+        data = {
+            'tile_size': tuple(layout['tile_size']),
+            'images': blobs(layout['images']),
+            'static': [(layer, index, tuple(pos)) for layer, index, pos in layout['static']],
+            'placements': [(layer, [tuple(cell) for cell in cells]) for layer, cells in layout['placements']],
+            'sheets': {name: blobs(sizes) for name, sizes in layout['sheets'].items()},
+        }
+        if offset != len(pixels):
+            return None
+        return data
+    except Exception:
+        return None
+
+
+def load_map(tmx_path):
+    """Wczytaj mapę z cache (albo skompiluj ją i zapisz cache); wynik jest zapamiętywany na cały proces.
+
+    Zwraca słownik: tile_size, static - lista (warstwa, powierzchnia, pozycja) w kolejności rysowania,
+    placements - lista (warstwa, [(x, y) w kafelkach]) dla warstw z SHEET_LAYERS,
+    sheets - nazwa arkusza -> lista klatek (widoki do wspólnego atlasu).
+    """
+    loaded = _loaded_maps.get(tmx_path)
+    if loaded is not None:
+        return loaded
+    path = _cache_path(tmx_path)
+    data = _read(path)
+    if data is None:
+        header, data = compile_map(tmx_path)
+        _write(path, header, data)
+
+    images = [_from_blob(blob) for blob in data['images']]
+    loaded = _loaded_maps[tmx_path] = {
+        'tile_size': data['tile_size'],
+        'static': [(layer, images[index], pos) for layer, index, pos in data['static']],
+        'placements': data['placements'],
+        'sheets': {name: atlas.pack(_from_blob(blob) for blob in blobs) for name, blobs in data['sheets'].items()},
+    }
+    return loaded
@@ -1,9 +1,66 @@
-import math
-import os
+from functools import lru_cache
+from types import MappingProxyType
 
+from autochess.utils.atlas import atlas
 from autochess.utils.config import *
+from autochess.utils.paths import find_file
 from config.setting import *
 
+from .combat import UNIT_ANIMATIONS, CombatProjectile, CombatUnit, UnitType
+
+
+@lru_cache(maxsize=None)
+def get_unit_frames(team, name, animation, flipped=False):
+    """Zwróć klatki animacji jednostki, wczytując arkusz z dysku tylko raz na proces.
+    flipped=True zwraca lustrzane odbicie klatek (jednostka patrzy w lewo)."""
+    if flipped:
+        return tuple(atlas.pack(pygame.transform.flip(frame, True, False)
+                                for frame in get_unit_frames(team, name, animation)))
+    pixel_size = 320 if name == 'lancer' else 192
+    path = find_file(f'files/units/{team}_units/{name}/{animation}.png')
+    return tuple(atlas.pack(import_img(path, pixel_size))) if path else ()
+
+
+def unit_asset_paths(teams=('blue', 'red'), names=tuple(UNIT_STATS)):
+    """Ścieżki arkuszy, które wczytają get_unit_frames i get_heal_effect_frames (do wstępnego dekodowania)"""
+    paths = [f'files/units/{team}_units/{name}/{animation}.png'
+             for team in teams for name in names for animation in UNIT_ANIMATIONS]
+    paths += [f'files/units/{team}_units/monk/Heal_Effect.png' for team in teams]
+    return [path for path in map(find_file, paths) if path is not None]
+
+
+@lru_cache(maxsize=None)
+def get_heal_effect_frames(team):
+    """Zwróć klatki efektu leczenia drużyny, wczytując arkusz z dysku tylko raz na proces"""
+    path = find_file(f'files/units/{team}_units/monk/Heal_Effect.png')
+    return tuple(atlas.pack(import_img(path, 192))) if path else ()
+
+
+# Obrazki strzały są obracane co tyle stopni
+ARROW_ANGLE_STEP = 5
+
+
+def create_arrow_image():
+    """Tworzy obrazek strzały"""
+    surf = pygame.Surface((20, 6), pygame.SRCALPHA)
+    pygame.draw.rect(surf, (139, 69, 19), (0, 2, 14, 2))
+    pygame.draw.polygon(surf, (169, 169, 169), [(14, 0), (20, 3), (14, 6)])
+    pygame.draw.polygon(surf, (200, 50, 50), [(0, 0), (4, 3), (0, 6)])
+    return surf
+
+
+@lru_cache(maxsize=None)
+def _arrow_bank():
+    base = create_arrow_image()
+    angles = range(ARROW_ANGLE_STEP, 360, ARROW_ANGLE_STEP)
+    return (base,) + tuple(pygame.transform.rotate(base, angle) for angle in angles)
+
+
+def get_arrow_image(angle=0.0):
+    """Zwróć obrazek strzały obrócony o kąt zaokrąglony do ARROW_ANGLE_STEP"""
+    bank = _arrow_bank()
+    return bank[int(round(angle / ARROW_ANGLE_STEP)) % len(bank)]
+
 
 class HealEffect(pygame.sprite.Sprite):
     """Efekt wizualny leczenia"""
@@ -13,11 +70,7 @@ class HealEffect(pygame.sprite.Sprite):
         self.target = target
         self.z = z
 
-        path = f'files/units/{team}_units/monk/Heal_effect.png'
-
-        self.frames = []
-        if os.path.exists(path):
-            self.frames = import_img(path, 192)
+        self.frames = get_heal_effect_frames(team)
 
         self.index = 0
         self.anim_speed = 0.15
@@ -48,266 +101,91 @@ class HealEffect(pygame.sprite.Sprite):
                 self.kill()
 
 
-class Projectile(pygame.sprite.Sprite):
+class Projectile(CombatProjectile, pygame.sprite.Sprite):
     """Klasa dla pocisków (strzały, magiczne pociski itp.)"""
 
-    def __init__(self, groups, start_pos, target, speed=8, z=Layer['Units']):
-        super().__init__(groups)
+    def __init__(self, groups, start_pos, target, speed=8, damage=1, owner=None, z=Layer['Units']):
+        pygame.sprite.Sprite.__init__(self, groups)
+        CombatProjectile.__init__(self, start_pos, target, speed, damage, owner)
         self.groups_ref = groups
-
-        self.pos = pygame.math.Vector2(start_pos)
-        self.target = target
-        self.target_pos = pygame.math.Vector2(target.rect.center)
-        self.speed = speed
         self.z = z
 
-        self.direction = self.target_pos - self.pos
-        if self.direction.length() > 0:
-            self.direction = self.direction.normalize()
-
-        self.angle = math.degrees(math.atan2(-self.direction.y, self.direction.x))
-
-        self.original_image = self.create_arrow_image()
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
+        self.original_image = get_arrow_image()
+        self.image = get_arrow_image(self.angle)
         self.rect = self.image.get_rect(center=start_pos)
 
-        self.hit = False
-        self.damage = 1
-
-    def create_arrow_image(self):
-        """Tworzy obrazek strzały"""
-        surf = pygame.Surface((20, 6), pygame.SRCALPHA)
-        pygame.draw.rect(surf, (139, 69, 19), (0, 2, 14, 2))
-        pygame.draw.polygon(surf, (169, 169, 169), [(14, 0), (20, 3), (14, 6)])
-        pygame.draw.polygon(surf, (200, 50, 50), [(0, 0), (4, 3), (0, 6)])
-        return surf
-
     def update(self):
-        if self.hit:
+        if self.done:
             return
 
-        if not self.target.alive:
+        CombatProjectile.update(self)
+        if self.done:
             self.kill()
             return
 
-        self.target_pos = pygame.math.Vector2(self.target.rect.center)
-
-        direction_to_target = self.target_pos - self.pos
-        distance = direction_to_target.length()
-
-        if distance > 0:
-            self.direction = direction_to_target.normalize()
-            self.angle = math.degrees(math.atan2(-self.direction.y, self.direction.x))
-            self.image = pygame.transform.rotate(self.original_image, self.angle)
+        self.image = get_arrow_image(self.angle)
+        self.rect = self.image.get_rect(center=(int(self.x), int(self.y)))
 
-        self.pos += self.direction * self.speed
-        self.rect = self.image.get_rect(center=(int(self.pos.x), int(self.pos.y)))
 
-        if distance < 15:
-            self.hit = True
-            self.target.take_damage(self.damage)
-            self.kill()
-
-
-class Unit(pygame.sprite.Sprite):
-    """Klasa bazowa dla wszystkich jednostek"""
-
-    def __init__(self, groups, pos, name, team, z=Layer['Units']):
-        super().__init__(groups)
-        self.groups_ref = groups
-        self.alive = True
-
-        stats = UNIT_STATS.get(name, UNIT_STATS['warrior'])
-
-        self.max_hp = stats['hp']
-        self.hp = stats['hp']
-        self.damage = stats['damage']
-        self.attack_range = stats['attack_range']
-        self.attack_delay = stats['attack_delay']
-        self.speed = stats['speed']
-        self.is_ranged = stats.get('is_ranged', False)
-        self.projectile_speed = stats.get('projectile_speed', 8)
-
-        self.is_healer = stats.get('is_healer', False)
-        self.heal_amount = stats.get('heal_amount', 1)
-        self.heal_range = stats.get('heal_range', 100)
-        self.heal_delay = stats.get('heal_delay', 90)
-        self.heal_cooldown = 0
-
-        self.anim_speed = stats.get('anim_speed', 0.10)
-        self.attack_anim_speed = stats.get('attack_anim_speed', 0.10)
-
-        self.status = 'Idle'
-        self.name = name
-        self.team = team
-        self.index = 0
+class UnitSpriteType(UnitType):
+    """UnitType z klatkami animacji: animations i animations_flipped (animacja -> krotka klatek)"""
 
-        self.facing_right = True
-        self.direction = 'side'
+    __slots__ = ('animations', 'animations_flipped')
 
-        self.target = None
-        self.attack_cooldown = 0
+    def __init__(self, name, team):
+        animations = {animation: get_unit_frames(team, name, animation) for animation in UNIT_ANIMATIONS}
+        super().__init__(name, team, anim_frames={
+            animation: len(frames) for animation, frames in animations.items()
+        })
+        self._set(
+            animations=MappingProxyType(animations),
+            # lustrzane klatki dla jednostki zwróconej w lewo
+            animations_flipped=MappingProxyType({
+                animation: get_unit_frames(team, name, animation, flipped=True) for animation in UNIT_ANIMATIONS
+            }),
+        )
+        # wczytaj efekt leczenia z góry, żeby leczenie w trakcie rundy nie sięgało do dysku
+        if self.is_healer:
+            get_heal_effect_frames(team)
 
-        self.is_attacking = False
-        self.is_healing = False
 
-        self.pending_shot = False
-        self.shot_target = None
-        self.shot_delay = 0
+@lru_cache(maxsize=None)
+def get_unit_sprite_type(team, name):
+    """Wspólny UnitSpriteType jednostek (team, name); klatki wczytywane przy pierwszym użyciu"""
+    return UnitSpriteType(name, team)
 
-        self.pending_heal = False
-        self.heal_target = None
-        self.heal_action_delay = 0
 
-        self.pos = pygame.math.Vector2(pos)
+class Unit(CombatUnit, pygame.sprite.Sprite):
+    """Klasa bazowa dla wszystkich jednostek: sprite nad stanem walki CombatUnit"""
 
-        self.import_assets()
+    def __init__(self, groups, pos, name, team, z=Layer['Units']):
+        pygame.sprite.Sprite.__init__(self, groups)
+        CombatUnit.__init__(self, name, team, pos, unit_type=get_unit_sprite_type(team, name))
+        self.groups_ref = groups
 
-        self.image = self.animations[self.status][self.index]
+        self.image = self.type.animations[self.status][self.index]
         self.rect = self.image.get_rect(topleft=pos)
         self.z = z
         self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.7, -self.rect.height * 0.7)
+        self.sync_pos_from_rect()
 
-    def import_assets(self):
-        """Importuj animacje jednostki"""
-        self.animations = {
-            'Idle': [],
-            'Run': [],
-            'Attack': [],
-            'Attack_down': [],
-            'Attack_up': [],
-            'Attack_downright': [],
-            'Attack_upright': [],
-            'Heal': [],
-        }
-
-        for animation in self.animations.keys():
-            pixle_size = 320 if self.name == 'lancer' else 192
-            path = f'files/units/{self.team}_units/{self.name}/{animation}.png'
-            if os.path.exists(path):
-                self.animations[animation] = import_img(path, pixle_size)
-
-    def get_distance_to(self, other):
-        """Oblicz dystans do innej jednostki"""
-        return math.hypot(
-            self.rect.centerx - other.rect.centerx,
-            self.rect.centery - other.rect.centery
-        )
-
-    def find_nearest_enemy(self, all_units):
-        """Znajdź najbliższego wroga"""
-        nearest = None
-        min_dist = float('inf')
-
-        for unit in all_units:
-            if not isinstance(unit, Unit):
-                continue
-
-            if unit.team != self.team and unit.alive:
-                dist = self.get_distance_to(unit)
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest = unit
-
-        return nearest
-
-    def find_wounded_ally(self, all_units):
-        """Znajdź najbliższego rannego sojusznika"""
-        nearest = None
-        min_dist = float('inf')
-
-        for unit in all_units:
-            if not isinstance(unit, Unit):
-                continue
-
-            if unit.team == self.team and unit.alive and unit != self:
-                if unit.hp < unit.max_hp:
-                    dist = self.get_distance_to(unit)
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest = unit
-
-        return nearest
-
-    def update_facing_direction(self, dx, dy):
-        """Aktualizuj kierunek patrzenia na podstawie ruchu"""
-        if abs(dx) > 0.1:
-            self.facing_right = dx > 0
-
-        angle = math.degrees(math.atan2(dy, abs(dx)))
-
-        if angle < -70:
-            self.direction = 'up'
-        elif angle < -35:
-            self.direction = 'up_side'
-        elif angle < 35:
-            self.direction = 'side'
-        elif angle < 70:
-            self.direction = 'down_side'
-        else:
-            self.direction = 'down'
-
-    def get_attack_animation(self):
-        """Pobierz odpowiednią animację ataku na podstawie kierunku"""
-        if self.name == 'lancer':
-            if self.direction == 'up' and self.animations['Attack_up']:
-                return 'Attack_up'
-            elif self.direction == 'down' and self.animations['Attack_down']:
-                return 'Attack_down'
-            elif self.direction == 'up_side' and self.animations['Attack_upright']:
-                return 'Attack_upright'
-            elif self.direction == 'down_side' and self.animations['Attack_downright']:
-                return 'Attack_downright'
-            elif self.animations['Attack']:
-                return 'Attack'
-            elif self.animations['Attack_downright']:
-                return 'Attack_downright'
-            else:
-                return 'Attack_up'
-
-        if self.direction == 'up' and self.animations['Attack_up']:
-            return 'Attack_up'
-        elif self.direction == 'down' and self.animations['Attack_down']:
-            return 'Attack_down'
-        elif self.animations['Attack']:
-            return 'Attack'
-
-        return 'Idle'
-
-    def move_towards(self, target):
-        """Ruszaj w kierunku celu"""
-        if target is None:
-            return
-
-        dx = target.rect.centerx - self.rect.centerx
-        dy = target.rect.centery - self.rect.centery
-        dist = math.hypot(dx, dy)
-
-        if dist > 0:
-            self.update_facing_direction(dx, dy)
-
-            move_dx = dx / dist * self.speed
-            move_dy = dy / dist * self.speed
-
-            self.pos.x += move_dx
-            self.pos.y += move_dy
-
-            self.rect.center = (int(self.pos.x), int(self.pos.y))
-            self.hitbox.center = self.rect.center
+    def moved(self):
+        """Przesuń sprite za pozycją z logiki walki"""
+        self.rect.center = (self.cx, self.cy)
+        self.hitbox.center = self.rect.center
 
     def shoot_projectile(self, target):
         """Wystrzel pocisk w kierunku celu"""
-        start_pos = self.rect.center
-
         # Add projectile only to visual group (exclude units group to avoid drag logic)
-        projectile = Projectile(
+        Projectile(
             groups=[self.groups_ref[0]],
-            start_pos=start_pos,
+            start_pos=self.rect.center,
             target=target,
-            speed=self.projectile_speed,
+            speed=self.type.projectile_speed,
+            damage=self.type.damage,
+            owner=self,
             z=Layer['Units']
         )
-        projectile.damage = self.damage
 
     def spawn_heal_effect(self, target):
         """Stwórz efekt leczenia na celu"""
@@ -319,183 +197,82 @@ class Unit(pygame.sprite.Sprite):
             z=Layer['Units']
         )
 
-    def attack(self, target):
-        """Zaatakuj cel"""
-        if self.is_attacking or self.is_healing or self.attack_cooldown > 0:
-            return
-
-        dx = target.rect.centerx - self.rect.centerx
-        dy = target.rect.centery - self.rect.centery
-        self.update_facing_direction(dx, dy)
-
-        if self.is_ranged:
-            self.pending_shot = True
-            self.shot_target = target
-            attack_anim = self.get_attack_animation()
-            anim_length = len(self.animations[attack_anim])
-            self.shot_delay = int(anim_length * 0.7 / self.attack_anim_speed)
-        elif self.name == 'lancer':
-            self.pending_shot = True
-            self.shot_target = target
-            attack_anim = self.get_attack_animation()
-            anim_length = len(self.animations[attack_anim])
-            self.shot_delay = int(anim_length * 0.8 / self.attack_anim_speed)
-        else:
-            target.take_damage(self.damage)
-
-        self.attack_cooldown = self.attack_delay
-        self.status = self.get_attack_animation()
-        self.index = 0
-        self.is_attacking = True
-
-    def heal(self, target):
-        """Ulecz sojusznika"""
-        if self.is_attacking or self.is_healing or self.heal_cooldown > 0:
-            return
-
-        dx = target.rect.centerx - self.rect.centerx
-        dy = target.rect.centery - self.rect.centery
-        self.update_facing_direction(dx, dy)
-
-        self.pending_heal = True
-        self.heal_target = target
-
-        if self.animations['Heal']:
-            anim_length = len(self.animations['Heal'])
-            self.heal_action_delay = int(anim_length * 0.5 / self.anim_speed)
-            self.status = 'Heal'
-        else:
-            target.receive_heal(self.heal_amount)
-            self.spawn_heal_effect(target)
-            self.pending_heal = False
-
-        self.heal_cooldown = self.heal_delay
-        self.index = 0
-        self.is_healing = True
-
-    def receive_heal(self, amount):
-        """Otrzymaj leczenie"""
-        self.hp = min(self.hp + amount, self.max_hp)
-
-    def take_damage(self, damage):
-        """Otrzymaj obrażenia"""
-        self.hp -= damage
-        if self.hp <= 0:
-            self.die()
+    def heal_landed(self, target, old_hp):
+        print(f"[HEAL] {target.team} {target.name}: {old_hp} HP -> {target.hp} HP")
+        super().heal_landed(target, old_hp)
 
     def die(self):
         """Jednostka ginie"""
-        self.alive = False
+        super().die()
         self.kill()
 
     def sync_pos_from_rect(self):
         """Zsynchronizuj pozycję z rect"""
-        self.pos.x = self.rect.centerx
-        self.pos.y = self.rect.centery
+        self.set_position(self.rect.center)
 
     def animate(self):
         """Animuj jednostkę"""
-        if 'Attack' in self.status:
-            current_speed = self.attack_anim_speed
-        else:
-            current_speed = self.anim_speed
-
-        self.index += current_speed
-
-        current_anim = self.animations[self.status]
-        if len(current_anim) == 0:
-            current_anim = self.animations['Idle']
-            if len(current_anim) == 0:
-                return
-
-        if self.index >= len(current_anim):
-            self.index = 0
-            if 'Attack' in self.status:
-                self.status = 'Idle'
-                self.is_attacking = False
-            if self.status == 'Heal':
-                self.status = 'Idle'
-                self.is_healing = False
-
-        frame = current_anim[int(self.index)]
-
-        if not self.facing_right:
-            frame = pygame.transform.flip(frame, True, False)
-
-        self.image = frame
-
-        if self.pending_shot:
-            self.shot_delay -= 1
-            if self.shot_delay <= 0:
-                if self.shot_target and self.shot_target.alive:
-                    if self.is_ranged:
-                        self.shoot_projectile(self.shot_target)
-                    else:
-                        self.shot_target.take_damage(self.damage)
-                self.pending_shot = False
-                self.shot_target = None
-
-        if self.pending_heal:
-            self.heal_action_delay -= 1
-            if self.heal_action_delay <= 0:
-                if self.heal_target and self.heal_target.alive:
-                    old_hp = self.heal_target.hp
-                    self.heal_target.hp = min(self.heal_target.hp + self.heal_amount, self.heal_target.max_hp)
-                    print(
-                        f"[HEAL] {self.heal_target.team} {self.heal_target.name}: {old_hp} HP -> {self.heal_target.hp} HP")
-                    self.spawn_heal_effect(self.heal_target)
-                self.pending_heal = False
-                self.heal_target = None
-
-    def combat_update(self, all_units):
-        """Aktualizacja logiki walki"""
-        if not self.alive:
-            return
-
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-
-        if self.heal_cooldown > 0:
-            self.heal_cooldown -= 1
-
-        if self.is_healer:
-            wounded_ally = self.find_wounded_ally(all_units)
-
-            if wounded_ally:
-                dist = self.get_distance_to(wounded_ally)
-
-                if dist <= self.heal_range:
-                    self.heal(wounded_ally)
-                else:
-                    if not self.is_healing:
-                        self.move_towards(wounded_ally)
-                        if self.animations['Run']:
-                            self.status = 'Run'
-                        else:
-                            self.status = 'Idle'
-            else:
-                if not self.is_healing:
-                    self.status = 'Idle'
+        animation = super().animate()
+        if animation is None:
             return
 
-        self.target = self.find_nearest_enemy(all_units)
-
-        if self.target:
-            dist = self.get_distance_to(self.target)
-
-            if dist <= self.attack_range:
-                self.attack(self.target)
-            else:
-                if not self.is_attacking:
-                    self.move_towards(self.target)
-                    if self.animations['Run']:
-                        self.status = 'Run'
-                    else:
-                        self.status = 'Idle'
-        else:
-            if not self.is_attacking:
-                self.status = 'Idle'
+        unit_type = self.type
+        animations = unit_type.animations if self.facing_right else unit_type.animations_flipped
+        self.image = animations[animation][int(self.index)]
 
     def update(self):
         """Główna aktualizacja jednostki"""
-        self.animate()
\ No newline at end of file
+        self.animate()
+
+    def revive(self, groups, pos):
+        """Przywróć jednostkę z puli: świeży stan walki, środek w pos, z powrotem w grupach"""
+        self.reset(pos)
+        self.groups_ref = groups
+        self.image = self.type.animations[self.status][self.index]
+        self.rect = self.image.get_rect(center=pos)
+        self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.7, -self.rect.height * 0.7)
+        self.sync_pos_from_rect()
+        self.add(*groups)
+
+
+class UnitPool:
+    """Pula jednostek według (drużyna, nazwa).
+    Zamiast kill() i tworzenia nowych Unit przy każdej zmianie rundy jednostki wracają do puli
+    i są ożywiane z pełnym stanem, więc przejście między rundami prawie nic nie alokuje."""
+
+    def __init__(self):
+        # (team, name) -> lista wolnych jednostek
+        self._free = {}
+        # jednostki wydane z puli (żywe i polegle), w kolejności wydania
+        self._active = {}
+
+    def acquire(self, groups, pos, name, team):
+        """Jednostka stojąca środkiem w pos, dodana do groups (z puli albo nowa)"""
+        free = self._free.get((team, name))
+        if free:
+            unit = free.pop()
+            unit.revive(groups, pos)
+        else:
+            unit = Unit(groups=groups, pos=pos, name=name, team=team)
+            unit.rect.center = pos
+            unit.sync_pos_from_rect()
+            unit.hitbox = unit.rect.copy().inflate(-unit.rect.width * 0.7, -unit.rect.height * 0.7)
+        self._active[unit] = None
+        return unit
+
+    def adopt(self, unit):
+        """Weź pod opiekę jednostkę utworzoną poza pulą (wróci do puli przy release)"""
+        self._active[unit] = None
+
+    def release(self, unit):
+        """Zdejmij jednostkę z planszy i odłóż ją do ponownego użycia"""
+        if unit not in self._active:
+            return
+        del self._active[unit]
+        unit.kill()
+        self._free.setdefault((unit.team, unit.name), []).append(unit)
+
+    def release_team(self, team):
+        """release() dla wszystkich wydanych jednostek drużyny, także poległych"""
+        for unit in [u for u in self._active if u.team == team]:
+            self.release(unit)
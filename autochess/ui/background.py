@@ -1,6 +1,8 @@
 import pygame
 import os
 
+from autochess.utils.assets import load_image
+
 DEBUG_BG = False  # set True temporarily to print load info
 
 def load_and_cover(path: str, target_size: tuple[int, int]) -> pygame.Surface:
@@ -9,7 +11,7 @@ def load_and_cover(path: str, target_size: tuple[int, int]) -> pygame.Surface:
     Center-crops excess.Similar to CSS background-size: cover.
     """
     target_w, target_h = target_size
-    raw = pygame.image.load(path).convert_alpha()
+    raw = load_image(path).convert_alpha()
     iw, ih = raw.get_width(), raw.get_height()
 
     scale = max(target_w / iw, target_h / ih)
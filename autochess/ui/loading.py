@@ -0,0 +1,49 @@
+import sys
+
+import pygame
+
+
+class LoadingScreen:
+    """
+    Progress bar shown while assets decode in the background.
+    Keeps the window responsive (events pumped, QUIT honoured) while waiting.
+    """
+
+    def __init__(self, screen, colors=None):
+        self.screen = screen
+        colors = colors or {}
+        self.color_bg = colors.get('bg', (18, 18, 24))
+        self.color_text = colors.get('text', (230, 230, 230))
+        self.color_bar = colors.get('highlight', (80, 125, 170))
+        self.font = pygame.font.SysFont(None, 40)
+        self.clock = pygame.time.Clock()
+
+    def draw(self, progress, label):
+        w, h = self.screen.get_size()
+        self.screen.fill(self.color_bg)
+
+        text = self.font.render(label, True, self.color_text)
+        self.screen.blit(text, text.get_rect(center=(w // 2, h // 2 - 40)))
+
+        bar = pygame.Rect(0, 0, int(w * 0.4), 16)
+        bar.center = (w // 2, h // 2 + 10)
+        pygame.draw.rect(self.screen, (40, 40, 52), bar)
+        fill = bar.copy()
+        fill.width = int(bar.width * max(0.0, min(progress, 1.0)))
+        if fill.width:
+            pygame.draw.rect(self.screen, self.color_bar, fill)
+        pygame.draw.rect(self.screen, (0, 0, 0), bar, 1)
+        pygame.display.update()
+
+    def wait(self, futures, label):
+        """Show progress until all futures are done."""
+        total = len(futures)
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    sys.exit(0)
+            done = sum(1 for future in futures if future.done())
+            self.draw(done / total if total else 1.0, label)
+            if done == total:
+                return
+            self.clock.tick(60)
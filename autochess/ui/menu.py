@@ -1,6 +1,8 @@
 import pygame
 import os
 
+from autochess.utils.assets import load_image
+
 class Menu:
     def __init__(self, screen, options, font=None, colors=None, logo_path='files/ui/hexa2.png'):
         """
@@ -25,7 +27,7 @@ class Menu:
             path = f'files/ui/buttons/{key}.png'
             if os.path.exists(path):
                 try:
-                    img = pygame.image.load(path).convert_alpha()
+                    img = load_image(path).convert_alpha()
                     self.button_images[key] = img
                 except Exception:
                     # ignore load errors; fallback to drawn buttons
@@ -35,7 +37,7 @@ class Menu:
         self.logo = None
         if os.path.exists(logo_path):
             try:
-                raw_logo = pygame.image.load(logo_path).convert_alpha()
+                raw_logo = load_image(logo_path).convert_alpha()
                 max_w = self.screen.get_width() * 0.55
                 scale = min(1.0, max_w / raw_logo.get_width())
                 new_size = (int(raw_logo.get_width() * scale),
@@ -2,6 +2,8 @@ import pygame
 import json
 import os
 
+from autochess.utils.assets import load_image
+
 SETTINGS_PATH = 'config/user_settings.json'
 DEFAULTS = {
     'music_volume': 0.50,
@@ -103,7 +105,7 @@ class SettingsScreen:
         self.options_art_path = 'files/ui/options_menu.png'
         if os.path.exists(self.options_art_path):
             try:
-                raw = pygame.image.load(self.options_art_path).convert_alpha()
+                raw = load_image(self.options_art_path).convert_alpha()
                 # scale to 50% of screen width while preserving aspect ratio
                 target_w = int(self.w * 0.5)
                 scale = target_w / raw.get_width()
@@ -120,25 +122,25 @@ class SettingsScreen:
 
         try:
             if os.path.exists('files/ui/slider_fill.png'):
-                self.slider_fill_img = pygame.image.load('files/ui/slider_fill.png').convert_alpha()
+                self.slider_fill_img = load_image('files/ui/slider_fill.png').convert_alpha()
         except Exception:
             self.slider_fill_img = None
 
         try:
             if os.path.exists('files/ui/button_minus.png'):
-                self.btn_minus_img = pygame.image.load('files/ui/button_minus.png').convert_alpha()
+                self.btn_minus_img = load_image('files/ui/button_minus.png').convert_alpha()
         except Exception:
             self.btn_minus_img = None
 
         try:
             if os.path.exists('files/ui/button_plus.png'):
-                self.btn_plus_img = pygame.image.load('files/ui/button_plus.png').convert_alpha()
+                self.btn_plus_img = load_image('files/ui/button_plus.png').convert_alpha()
         except Exception:
             self.btn_plus_img = None
 
         try:
             if os.path.exists('files/ui/x.png'):
-                self.x_img = pygame.image.load('files/ui/x.png').convert_alpha()
+                self.x_img = load_image('files/ui/x.png').convert_alpha()
         except Exception:
             self.x_img = None
 
@@ -3,6 +3,8 @@ import os
 import random
 import pygame
 
+from autochess.utils.assets import load_image
+
 
 class Shop:
     """
@@ -94,7 +96,7 @@ class Shop:
 
     def _safe_load_image(self, path, convert_alpha=False):
         try:
-            img = pygame.image.load(path)
+            img = load_image(path)
             return img.convert_alpha() if convert_alpha else img.convert()
         except Exception as e:
             return None
@@ -155,6 +157,11 @@ class Shop:
         self.card_cache[key] = surf
         return surf
 
+    def dirty_rects(self):
+        """Screen areas covered by the overlay; redrawn every frame in dirty-rect mode."""
+        area = self.rect.union(self.bar_rect) if self.bar_rect else self.rect.copy()
+        return [area, self.debug_btn_rect]
+
     def handle_event(self, event):
         if event.type == pygame.VIDEORESIZE:
             self.rect = self._compute_rect()
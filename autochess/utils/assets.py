@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+import pytmx
+from pytmx.util_pygame import handle_transformation, smart_convert
+
+from autochess.utils.paths import find_file
+
+# images the menu and the settings screen need before the first frame
+MENU_ASSETS = (
+    'files/ui/bg_archer.png',
+    'files/ui/hexa2.png',
+    'files/ui/buttons/play.png',
+    'files/ui/buttons/options.png',
+    'files/ui/buttons/quit.png',
+    'files/ui/options_menu.png',
+    'files/ui/slider_fill.png',
+    'files/ui/button_minus.png',
+    'files/ui/button_plus.png',
+    'files/ui/x.png',
+)
+# shop art the PLAY state loads, decoded in the background (unit sheets: units.unit_asset_paths)
+PLAY_ASSET_DIRS = ('files/ui/cards',)
+PLAY_ASSETS = ('files/ui/shop_bar.png', 'files/ui/coin.png')
+# map tiles; only needed when the compiled map cache has to be rebuilt
+MAP_ASSET_DIRS = ('files/tiles',)
+
+# decode threads (pygame releases the GIL while SDL_image decodes)
+WORKERS = min(4, os.cpu_count() or 1)
+
+_executor = None
+# normalized path -> Future with the decoded, not yet converted Surface
+_pending = {}
+
+
+def _key(path):
+    # realpath so aliases of one file (symlinks, '..' segments) share a single decode
+    return os.path.normcase(os.path.realpath(find_file(path) or path))
+
+
+def asset_paths(directories=PLAY_ASSET_DIRS, files=PLAY_ASSETS):
+    """`files` plus every PNG under `directories` (by default: all PNGs used by the PLAY state)."""
+    paths = list(files)
+    for directory in directories:
+        root = find_file(directory)
+        if root is None:
+            continue
+        for parent, _, files in os.walk(root):
+            paths.extend(os.path.join(parent, name) for name in sorted(files) if name.lower().endswith('.png'))
+    return paths
+
+
+def preload(paths):
+    """Start decoding `paths` on the thread pool and return their futures.
+    Missing files are skipped; conversion (convert_alpha) stays with the caller on the main thread."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='asset-decode')
+    futures = []
+    for path in paths:
+        resolved = find_file(path)
+        if resolved is None:
+            continue
+        key = _key(resolved)
+        future = _pending.get(key)
+        if future is None:
+            future = _pending[key] = _executor.submit(pygame.image.load, resolved)
+        futures.append(future)
+    return futures
+
+
+def discard(paths):
+    """Drop preloads of `paths` nobody claimed, so their decoded surfaces do not stay in memory."""
+    for path in paths:
+        _pending.pop(_key(path), None)
+
+
+def load_image(path):
+    """pygame.image.load that takes the preloaded decode of `path` when there is one."""
+    future = _pending.pop(_key(path), None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            # decode failed in the background; load again so the caller gets the usual error
+            pass
+    return pygame.image.load(path)
+
+
+def _tmx_image_loader(filename, colorkey, **kwargs):
+    # pytmx.util_pygame.pygame_image_loader, with the tileset image taken from the preload
+    if colorkey:
+        colorkey = pygame.Color(f'#{colorkey}')
+    pixelalpha = kwargs.get('pixelalpha', True)
+    image = load_image(filename)
+
+    def load_tile(rect=None, flags=None):
+        tile = image.subsurface(rect) if rect else image.copy()
+        if flags:
+            tile = handle_transformation(tile, flags)
+        return smart_convert(tile, colorkey, pixelalpha)
+
+    return load_tile
+
+
+def load_tmx(path, sources=None):
+    """pytmx.util_pygame.load_pygame whose tileset images come through load_image.
+    When `sources` is a list, the path of every tileset image is appended to it."""
+    loader = _tmx_image_loader
+    if sources is not None:
+        def loader(filename, colorkey, **kwargs):
+            sources.append(filename)
+            return _tmx_image_loader(filename, colorkey, **kwargs)
+    return pytmx.TiledMap(path, image_loader=loader)
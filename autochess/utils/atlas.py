@@ -0,0 +1,105 @@
+import weakref
+
+import pygame
+
+from config.setting import ATLAS_PAGE_SIZE, TEXTURE_ATLAS
+
+
+class TextureAtlas:
+    """Packs animation frames into a few large page surfaces.
+
+    pack() copies each frame into a page (shelf packing: rows of similar height)
+    and returns subsurface views, so the frames of every unit and decoration live
+    in a handful of allocations instead of one Surface each. Frames larger than a
+    page are returned unchanged.
+    """
+
+    def __init__(self, page_size=ATLAS_PAGE_SIZE, enabled=TEXTURE_ATLAS):
+        self.page_size = page_size
+        self.enabled = enabled
+        self.pages = []
+        # per page: list of shelves [y, height, next_x] and the first free row
+        self._shelves = []
+        self._tops = []
+        self.frames = 0
+        # memory the frames would hold without the atlas, and what the unpacked ones still hold
+        self.surfaces_before = 0
+        self.frame_bytes = 0
+        self.standalone = 0
+        self.standalone_bytes = 0
+        # sheets already counted for view frames (weak, so the report does not keep them alive)
+        self._sheets_before = weakref.WeakSet()
+        self._sheets_standalone = weakref.WeakSet()
+
+    @staticmethod
+    def _held(surf, seen):
+        # (surfaces, bytes) kept alive by a frame: its own pixels, or for a subsurface view
+        # the whole sheet behind it, counted once per sheet
+        sheet = surf.get_abs_parent()
+        if sheet is not surf:
+            if sheet in seen:
+                return 0, 0
+            seen.add(sheet)
+        return 1, sheet.get_width() * sheet.get_height() * sheet.get_bytesize()
+
+    def _place(self, w, h):
+        # an existing shelf that fits the frame without wasting more than a quarter of its height
+        for page, shelves in enumerate(self._shelves):
+            for shelf in shelves:
+                y, height, x = shelf
+                if h <= height <= h + h // 4 and x + w <= self.page_size:
+                    shelf[2] = x + w
+                    return page, (x, y)
+        # a new shelf under the last one
+        for page, top in enumerate(self._tops):
+            if top + h <= self.page_size:
+                self._shelves[page].append([top, h, w])
+                self._tops[page] = top + h
+                return page, (0, top)
+        # a new page
+        self.pages.append(pygame.Surface((self.page_size, self.page_size), pygame.SRCALPHA))
+        self._shelves.append([[0, h, w]])
+        self._tops.append(h)
+        return len(self.pages) - 1, (0, 0)
+
+    def add(self, surf):
+        """Copy `surf` into the atlas and return a subsurface view of the copy."""
+        w, h = surf.get_size()
+        self.frames += 1
+        surfaces, size = self._held(surf, self._sheets_before)
+        self.surfaces_before += surfaces
+        self.frame_bytes += size
+        if not self.enabled or w > self.page_size or h > self.page_size:
+            surfaces, size = self._held(surf, self._sheets_standalone)
+            self.standalone += surfaces
+            self.standalone_bytes += size
+            return surf
+        page, pos = self._place(w, h)
+        rect = pygame.Rect(pos, (w, h))
+        self.pages[page].blit(surf, rect)
+        return self.pages[page].subsurface(rect)
+
+    def pack(self, surfs):
+        """add() for every frame; returns a list of views in the same order."""
+        return [self.add(surf) for surf in surfs]
+
+    def memory_report(self):
+        """Pixel memory of the frames without the atlas (before) and with it (after).
+        Frames that are views into a sheet count as the sheet they keep alive."""
+        page_bytes = sum(page.get_width() * page.get_height() * page.get_bytesize() for page in self.pages)
+        used = sum(x * height for shelves in self._shelves for _, height, x in shelves)
+        capacity = len(self.pages) * self.page_size * self.page_size
+        return {
+            'frames': self.frames,
+            'frame_bytes': self.frame_bytes,
+            'surfaces_before': self.surfaces_before,
+            'surfaces_after': len(self.pages) + self.standalone,
+            'pages': len(self.pages),
+            'page_bytes': page_bytes,
+            'bytes_after': page_bytes + self.standalone_bytes,
+            'page_fill': used / capacity if capacity else 0.0,
+        }
+
+
+# shared atlas for unit and decoration frames
+atlas = TextureAtlas()
@@ -1,31 +1,37 @@
 import pygame
 
-def import_img(path,pixel_size):
-    img=pygame.image.load(path).convert_alpha()
-    size=img.get_size()
+from autochess.utils.assets import load_image
+from config.setting import SLICE_VIEWS
+
+def _slice(img,pixel_size,height,view):
+    # views share the sheet's pixels; frames reaching past the sheet edge are always copied
+    sheet_rect=img.get_rect()
     surface_list=[]
+    for x in range(0,img.get_width(),pixel_size):
+        rect=pygame.Rect(x,0,pixel_size,height)
+        if view and sheet_rect.contains(rect):
+            surface_list.append(img.subsurface(rect))
+            continue
+        surface=pygame.Surface((pixel_size,height), flags=pygame.SRCALPHA)
+        surface.blit(img,(0,0),rect)
+        surface_list.append(surface)
+    return surface_list
+
+def import_img(path,pixel_size,view=SLICE_VIEWS):
+    """Slice a horizontal sheet into pixel_size x pixel_size frames.
+    view=True returns subsurfaces of the loaded sheet (no copies)."""
+    img=load_image(path).convert_alpha()
+    size=img.get_size()
     if size[0]>pixel_size:
-        title_num_x=size[0]
-        for x in range(0,title_num_x,pixel_size):
-            surface=pygame.Surface((pixel_size,pixel_size), flags=pygame.SRCALPHA)
-            surface.blit(img,(0,0),pygame.Rect(x,0,pixel_size,pixel_size))
-            surface_list.append(surface)
-        return surface_list
+        return _slice(img,pixel_size,pixel_size,view)
     else:
-        surface_list.append(img)
-        return surface_list
+        return [img]
 
-def import_img_two_diff_sizes(path,pixel_size,pixelsize_two):
-    img=pygame.image.load(path).convert_alpha()
+def import_img_two_diff_sizes(path,pixel_size,pixelsize_two,view=SLICE_VIEWS):
+    """import_img with frames pixel_size wide and pixelsize_two high."""
+    img=load_image(path).convert_alpha()
     size=img.get_size()
-    surface_list=[]
     if size[0]>pixel_size:
-        title_num_x=size[0]
-        for x in range(0,title_num_x,pixel_size):
-            surface=pygame.Surface((pixel_size,pixelsize_two), flags=pygame.SRCALPHA)
-            surface.blit(img,(0,0),pygame.Rect(x,0,pixel_size,pixelsize_two))
-            surface_list.append(surface)
-        return surface_list
+        return _slice(img,pixel_size,pixelsize_two,view)
     else:
-        surface_list.append(img)
-        return surface_list
\ No newline at end of file
+        return [img]
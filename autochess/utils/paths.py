@@ -0,0 +1,31 @@
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def find_file(path):
+    """Return the existing path matching `path` ignoring letter case, or None."""
+    if os.path.exists(path):
+        return path
+    parent, name = os.path.split(path)
+    if parent:
+        parent = find_file(parent)
+        if parent is None:
+            return None
+    try:
+        entries = os.listdir(parent or '.')
+    except OSError:
+        return None
+    for entry in entries:
+        if entry.lower() == name.lower():
+            return os.path.join(parent, entry)
+    return None
+
+
+def png_size(path):
+    """Read (width, height) from a PNG header without decoding the image."""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError(f'{path} is not a PNG file')
+    return int.from_bytes(header[16:20], 'big'), int.from_bytes(header[20:24], 'big')
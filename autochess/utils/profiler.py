@@ -0,0 +1,216 @@
+import atexit
+import csv
+import os
+import time
+from collections import deque
+
+import pygame
+
+# frame stages in display order; nested stages (combat inside grid) are timed exclusively
+STAGES = ('events', 'grid', 'combat', 'update', 'draw', 'shop', 'overlay', 'display', 'wait')
+# frames kept for the rolling statistics and the graph
+WINDOW = 240
+# the text part of the overlay is re-rendered every this many frames (the graph every frame)
+TEXT_REFRESH = 15
+GRAPH_HEIGHT = 60
+# seconds a trace start/stop notice stays on screen (also when the overlay is hidden)
+NOTICE_TIME = 3.0
+
+
+class FrameProfiler:
+    """Per-frame stage timings with an on-screen overlay and an optional CSV trace.
+
+    Code marks stages with begin(name) / end(). While neither the overlay nor the
+    trace is on, every call returns immediately, so the marks can stay in the loop.
+    The trace file is closed by close(), which also runs at interpreter exit.
+    """
+
+    def __init__(self):
+        self.visible = False
+        self.recording = False
+        self.active = False
+        self.frames = deque(maxlen=WINDOW)
+        self._stack = []
+        self._current = None
+        self._frame_start = None
+        self._trace_file = None
+        self._trace = None
+        self.trace_path = None
+        self._notice = None
+        self._notice_until = 0.0
+        self._font = None
+        self._text = []
+        self._text_age = TEXT_REFRESH
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def _update_active(self):
+        self.active = self.visible or self.recording
+        if not self.active:
+            self.frames.clear()
+            self._frame_start = None
+
+    def toggle(self):
+        """Show or hide the overlay."""
+        self.visible = not self.visible
+        self._text_age = TEXT_REFRESH
+        self._update_active()
+
+    @property
+    def shown(self):
+        """True while draw() puts something on screen: the overlay or a trace notice."""
+        return self.visible or (self._notice is not None and time.perf_counter() < self._notice_until)
+
+    def _notify(self, text):
+        self._notice = text
+        self._notice_until = time.perf_counter() + NOTICE_TIME
+        self._text_age = TEXT_REFRESH
+
+    def toggle_trace(self, directory='.'):
+        """Start or stop writing one CSV row per frame; returns the trace path when starting."""
+        if self.recording:
+            self.close()
+            return None
+        path = os.path.join(directory, time.strftime('frame_trace_%Y%m%d_%H%M%S.csv'))
+        self._trace_file = open(path, 'w', newline='', encoding='utf-8')
+        self._trace = csv.writer(self._trace_file)
+        self._trace.writerow(('frame_ms', 'ticks') + tuple(f'{stage}_ms' for stage in STAGES)
+                             + ('sprites', 'blue_alive', 'red_alive'))
+        self.trace_path = path
+        self.recording = True
+        self._update_active()
+        self._notify(f'recording {os.path.basename(path)}')
+        return path
+
+    def close(self):
+        """Stop the CSV trace, if one is being written, and close its file."""
+        if not self.recording:
+            return
+        self._trace_file.close()
+        self._trace_file = self._trace = None
+        self.recording = False
+        self._update_active()
+        self._notify(f'trace saved: {os.path.basename(self.trace_path)}')
+
+    def begin(self, stage):
+        if not self.active:
+            return
+        self._stack.append([stage, time.perf_counter(), 0.0])
+
+    def end(self):
+        if not self.active or not self._stack:
+            return
+        stage, start, children = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._current is not None:
+            self._current[stage] = self._current.get(stage, 0.0) + elapsed - children
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def tick(self):
+        """Count one simulation tick in the current frame."""
+        if self.active and self._current is not None:
+            self._current['ticks'] = self._current.get('ticks', 0) + 1
+
+    def frame(self, sprites=0, alive=(0, 0)):
+        """Close the current frame (called once per loop iteration) and start the next one."""
+        if not self.active:
+            return
+        now = time.perf_counter()
+        self._stack.clear()
+        if self._frame_start is not None and self._current is not None:
+            record = self._current
+            record['frame'] = now - self._frame_start
+            record['sprites'] = sprites
+            record['alive'] = alive
+            self.frames.append(record)
+            if self._trace is not None:
+                self._trace.writerow([f'{record["frame"] * 1000:.3f}', record.get('ticks', 0)]
+                                     + [f'{record.get(stage, 0.0) * 1000:.3f}' for stage in STAGES]
+                                     + [sprites, alive[0], alive[1]])
+        self._frame_start = now
+        self._current = {}
+
+    # --- overlay ---
+    def _percentile(self, ordered, q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def draw(self, surface, target_fps):
+        """Draw the overlay in the top-right corner; returns its rect (empty when hidden).
+        With the overlay off, only a pending trace notice is drawn."""
+        if not self.shown:
+            self.rect = pygame.Rect(0, 0, 0, 0)
+            return self.rect
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 20)
+        if not self.visible:
+            text = self._font.render(self._notice, True, (230, 230, 230))
+            self.rect = pygame.Rect(0, 0, text.get_width() + 16, text.get_height() + 12)
+            self.rect.topright = (surface.get_width() - 10, 10)
+            panel = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            panel.fill((10, 10, 16, 200))
+            panel.blit(text, (8, 6))
+            surface.blit(panel, self.rect)
+            return self.rect
+        frames = list(self.frames)
+        self._text_age += 1
+        if self._text_age >= TEXT_REFRESH:
+            self._text_age = 0
+            self._text = [self._font.render(line, True, (230, 230, 230)) for line in self._text_lines(frames)]
+
+        line_h = self._font.get_linesize()
+        width = 340
+        height = 8 + line_h * len(self._text) + 8 + GRAPH_HEIGHT + 8
+        self.rect = pygame.Rect(surface.get_width() - width - 10, 10, width, height)
+
+        panel = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        panel.fill((10, 10, 16, 200))
+        for i, text in enumerate(self._text):
+            panel.blit(text, (8, 8 + i * line_h))
+        self._graph(panel, frames, target_fps)
+
+        surface.blit(panel, self.rect)
+        return self.rect
+
+    def _text_lines(self, frames):
+        lines = []
+        if frames:
+            times = sorted(f['frame'] * 1000 for f in frames)
+            mean = sum(times) / len(times)
+            last = frames[-1]
+            lines.append(f'FPS {1000 / mean:5.1f}   frame p50 {self._percentile(times, 0.5):5.1f}  '
+                         f'p99 {self._percentile(times, 0.99):5.1f}  max {times[-1]:5.1f} ms')
+            for stage in STAGES:
+                avg = sum(f.get(stage, 0.0) for f in frames) / len(frames) * 1000
+                lines.append(f'{stage:<8} {avg:6.2f} ms')
+            lines.append(f'sprites {last["sprites"]}   units blue {last["alive"][0]} red {last["alive"][1]}'
+                         f'   ticks/frame {last.get("ticks", 0)}')
+        else:
+            lines.append('collecting...')
+        if self.recording:
+            lines.append(f'recording {os.path.basename(self.trace_path)}')
+        elif self.shown and self._notice:
+            lines.append(self._notice)
+        return lines
+
+    def _graph(self, panel, frames, target_fps):
+        # frame-time graph: one bar per frame, the line marks the target frame time
+        width, height = panel.get_size()
+        graph = pygame.Rect(8, height - GRAPH_HEIGHT - 8, width - 16, GRAPH_HEIGHT)
+        pygame.draw.rect(panel, (30, 30, 40, 220), graph)
+        budget = 1000 / target_fps
+        scale = GRAPH_HEIGHT / (budget * 3)
+        bar_w = graph.width / WINDOW
+        for i, f in enumerate(frames):
+            ms = f['frame'] * 1000
+            h = min(GRAPH_HEIGHT, max(1, int(ms * scale)))
+            color = (80, 200, 120) if ms <= budget * 1.1 else (230, 180, 60) if ms <= budget * 2 else (230, 70, 70)
+            x = graph.x + int(i * bar_w)
+            pygame.draw.rect(panel, color, (x, graph.bottom - h, max(1, int(bar_w)), h))
+        target_y = graph.bottom - int(budget * scale)
+        pygame.draw.line(panel, (200, 200, 200), (graph.x, target_y), (graph.right - 1, target_y))
+
+
+# shared instance used by the game loop and the board
+profiler = FrameProfiler()
+# every exit path (window close, Esc, menu Quit) ends in sys.exit, so the trace is flushed here
+atexit.register(profiler.close)
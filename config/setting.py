@@ -4,6 +4,22 @@ SCREEN_HEIGHT = 1080
 
 # map settings
 title_size = 64
+MAP_PATH = 'files/map_tiled/map.tmx'
+# compiled map (parsed tmx + sliced tile pixels), rebuilt automatically when a source file changes
+MAP_CACHE_DIR = 'cache'
+# import_img returns frames as subsurface views of the loaded sheet instead of a copy per frame
+SLICE_VIEWS = True
+# pack unit and decoration animation frames into shared atlas pages (ATLAS_PAGE_SIZE px square);
+# 1920 is a multiple of every frame width used (64, 128, 192, 320), so rows fill without gaps.
+# Off by default: it turns ~500 frame surfaces into 7, but takes ~3% more pixel memory (last page)
+# and blits from subsurfaces were ~10% slower here; `benchmark --only memory` shows both numbers
+TEXTURE_ATLAS = False
+ATLAS_PAGE_SIZE = 1920
+
+# hex board
+BOARD_COLS = 9
+BOARD_ROWS = 6
+BOARD_CENTER = (SCREEN_WIDTH // 2 + title_size, SCREEN_HEIGHT // 2)
 
 # draw order for sprites
 Layer = {
@@ -23,7 +39,16 @@ Layer = {
 }
 
 # game loop settings
+# display frame cap
 FPS = 120
+# fixed simulation rate: cooldowns, speeds and animation speeds in UNIT_STATS are counted in ticks
+TICK_RATE = 120
+# longest frame fed to the simulation (after a stall the game slows down instead of freezing)
+MAX_FRAME_TIME = 0.25
+# moves longer than this (px per tick) are drawn without interpolation (teleports, snapping)
+INTERPOLATION_MAX_STEP = 32
+# redraw only changed regions of the board during PLAY (full redraw on phase change / resize)
+DIRTY_RECTS = False
 
 # audio / UI settings
 # default menu volume — changed to 50% so sliders start at a sensible level
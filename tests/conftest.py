@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    """Asset paths in the game are relative to the repository root."""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope='session')
+def display():
+    """A hidden display, needed by convert_alpha() when unit frames are loaded."""
+    import pygame
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    yield screen
+    pygame.quit()
@@ -0,0 +1,18 @@
+from autochess.core.battle_runner import parse_lineup, run_batch, summarize
+
+LINEUP = parse_lineup(['warrior@2,1', 'archer@3,0', 'monk@4,1'], 'blue') + \
+    parse_lineup(['lancer@2,7', 'warrior@3,8'], 'red')
+
+
+def test_results_do_not_depend_on_worker_count():
+    serial = run_batch(LINEUP, 12, jitter=8, seed=3, workers=1)
+    parallel = run_batch(LINEUP, 12, jitter=8, seed=3, workers=3)
+    assert parallel == serial
+    assert summarize(parallel) == summarize(serial)
+
+
+def test_seed_and_jitter_change_the_fights():
+    base = run_batch(LINEUP, 12, jitter=8, seed=3, workers=1)
+    assert run_batch(LINEUP, 12, jitter=8, seed=4, workers=1) != base
+    still = run_batch(LINEUP, 4, jitter=0, seed=3, workers=1)
+    assert len(set(still)) == 1
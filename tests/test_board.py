@@ -0,0 +1,91 @@
+import random
+
+import pygame
+
+from autochess.core import game_loop
+from autochess.core.game_loop import Game
+from autochess.game.board import Board
+from config.setting import BOARD_CENTER
+
+
+def make_board(surface):
+    # decoration variants are picked at random
+    random.seed(0)
+    board = Board(hex_center=BOARD_CENTER)
+    board.all_sprites.display_surf = surface
+    return board
+
+
+def frame(surface):
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+def test_dirty_rects_match_full_redraw(display):
+    size = display.get_size()
+    full_surf, dirty_surf = pygame.Surface(size), pygame.Surface(size)
+    full, dirty = make_board(full_surf), make_board(dirty_surf)
+    dirty.all_sprites.track_dirty = True
+
+    def step(i, ticks=1):
+        for _ in range(ticks):
+            full.tick()
+            dirty.tick()
+        alpha = (i * 0.37) % 1
+        full_surf.fill('black')
+        full.draw(alpha=alpha)
+        return dirty.draw(dirty=True, alpha=alpha)
+
+    dirty_surf.fill('black')
+    dirty.draw()
+    # let the hex grid appear, then place units next to the enemy
+    for i in range(120):
+        step(i)
+    for name, pos in (('archer', (900, 500)), ('warrior', (800, 400)), ('lancer', (700, 450))):
+        assert full.spawn_blue_unit(name, pos) is not None
+        assert dirty.spawn_blue_unit(name, pos) is not None
+    for board in (full, dirty):
+        board.snapshot_planning_layout()
+        board.snapshot_enemy_layout()
+        board.hex_manager.toggle_combat()
+
+    # until the first unit dies, so a removed sprite is covered too
+    start = full.team_alive_counts()
+    redrawn = 0
+    for i in range(400):
+        rects = step(i, ticks=1 + i % 3)
+        redrawn += bool(rects)
+        assert frame(dirty_surf) == frame(full_surf), f'frame {i}'
+        if full.team_alive_counts() != start:
+            break
+    assert redrawn
+    assert full.team_alive_counts() != start
+
+
+class RecordingBoard:
+    def __init__(self):
+        self.draws = []
+
+    def draw(self, dirty=False, overlay_rects=(), alpha=1.0):
+        self.draws.append(dirty)
+        return [] if dirty else None
+
+
+class NoShop:
+    def dirty_rects(self):
+        return []
+
+
+def test_phase_change_forces_full_redraw(display, monkeypatch):
+    monkeypatch.setattr(game_loop, 'DIRTY_RECTS', True)
+    game = Game.__new__(Game)
+    game.screen, game.board, game.shop = display, RecordingBoard(), NoShop()
+    game._render_key = None
+
+    for phase in ('PLANNING', 'PLANNING', 'COMBAT', 'COMBAT', 'PLANNING'):
+        game.phase = phase
+        game._draw_board(1.0)
+    assert game.board.draws == [False, True, False, True, False]
+
+    monkeypatch.setattr(game_loop, 'DIRTY_RECTS', False)
+    game._draw_board(1.0)
+    assert game.board.draws[-1] is False
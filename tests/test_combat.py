@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from autochess.core.battle_runner import TEAMS, run_batch, wilson_interval
+from autochess.core.benchmark import roster
+from autochess.game import combat
+from autochess.game.combat import MAX_TICKS, CombatEngine, SpatialHash, build_lineup, simulate, wave_extras
+
+LINEUP = [
+    {'name': 'warrior', 'team': 'blue', 'hex': (2, 1)},
+    {'name': 'archer', 'team': 'blue', 'hex': (3, 0)},
+    {'name': 'monk', 'team': 'blue', 'hex': (4, 1)},
+    {'name': 'lancer', 'team': 'red', 'hex': (2, 7)},
+    {'name': 'warrior', 'team': 'red', 'hex': (3, 8)},
+    {'name': 'archer', 'team': 'red', 'hex': (4, 8)},
+] + [dict(spec, team='red') for spec in wave_extras(3)]
+
+
+def trace(units, ticks):
+    """Positions, HP and animation state of every unit after each tick."""
+    engine = CombatEngine(units)
+    states = []
+    for _ in range(ticks):
+        engine.step()
+        states.append([(u.x, u.y, u.hp, u.status, u.index, u.alive) for u in engine.units])
+    return states
+
+
+def test_simulate_is_deterministic():
+    first = simulate(LINEUP)
+    second = simulate(LINEUP)
+    assert first['winner'] is not None
+    assert first == second
+
+
+def test_engine_trace_is_deterministic():
+    assert trace(build_lineup(LINEUP), 400) == trace(build_lineup(LINEUP), 400)
+
+
+def scattered_units(seed, size):
+    rng = random.Random(seed)
+    units = build_lineup(roster(size))
+    for unit in units:
+        unit.set_position((rng.randrange(0, 1920), rng.randrange(0, 1080)))
+        unit.hp = rng.randint(1, unit.max_hp)
+        unit.alive = rng.random() > 0.1
+    return units
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_spatial_hash_matches_linear_scan(seed):
+    units = scattered_units(seed, 120)
+    index = SpatialHash()
+    index.rebuild([u for u in units if u.alive])
+    for unit in units:
+        assert unit.find_nearest_enemy(units, index) is unit.find_nearest_enemy(units)
+        assert unit.find_wounded_ally(units, index) is unit.find_wounded_ally(units)
+
+
+def test_spatial_hash_fight_matches_linear_fight(monkeypatch):
+    lineup = roster(120)
+    with_index = trace(build_lineup(lineup), 150)
+    monkeypatch.setattr(combat, 'SPATIAL_MIN_UNITS', float('inf'))
+    assert trace(build_lineup(lineup), 150) == with_index
+
+
+@pytest.mark.parametrize('size', [6, 24])
+def test_numpy_backend_keeps_the_mirrored_winner(size):
+    pytest.importorskip('numpy')
+    python = simulate(roster(size))
+    numpy = simulate(roster(size), backend='numpy')
+    assert numpy['ticks'] < MAX_TICKS
+    assert numpy['winner'] == python['winner']
+
+
+def test_numpy_backend_win_rates_match_python():
+    pytest.importorskip('numpy')
+    fights = 24
+    results = {backend: run_batch(roster(6), fights, jitter=8, seed=0, backend=backend, workers=1)
+               for backend in ('python', 'numpy')}
+    for backend, other in (('python', 'numpy'), ('numpy', 'python')):
+        assert all(ticks < MAX_TICKS for _, ticks, _ in results[backend])
+        for outcome in TEAMS + (None,):
+            wins = sum(1 for winner, _, _ in results[backend] if winner == outcome)
+            other_rate = sum(1 for winner, _, _ in results[other] if winner == outcome) / fights
+            low, high = wilson_interval(wins, fights)
+            assert low <= other_rate <= high
@@ -0,0 +1,72 @@
+import math
+import random
+
+import pygame
+
+from autochess.game.hex_board import HexGridManager
+from autochess.game.units import Unit
+from config.setting import BOARD_CENTER, BOARD_COLS, BOARD_ROWS
+
+
+def make_grid(units):
+    group = pygame.sprite.Group()
+    grid = HexGridManager(BOARD_COLS, BOARD_ROWS, BOARD_CENTER, group, units, layer=0)
+    grid.generate()
+    return grid
+
+
+def test_initialize_occupancy_moves_hitbox_with_unit(display):
+    units = pygame.sprite.Group()
+    # off-centre start, like units placed by the map or rebuilt between rounds
+    unit = Unit(groups=[units], pos=(1000, 300), name='warrior', team='red')
+    grid = make_grid(units)
+
+    grid.initialize_occupancy()
+
+    key = grid.cell_of(unit)
+    assert key is not None
+    assert unit.rect.center == grid.hex_by_key[key].rect.center
+    assert unit.hitbox.center == unit.rect.center
+    assert (unit.cx, unit.cy) == unit.rect.center
+
+
+def drag(grid, monkeypatch, start, end):
+    """Press on `start`, move to `end` and release, one collision() call per step."""
+    for pos, pressed in ((start, True), (end, True), (end, False)):
+        monkeypatch.setattr(pygame.mouse, 'get_pos', lambda pos=pos: pos)
+        monkeypatch.setattr(pygame.mouse, 'get_pressed', lambda *args, pressed=pressed: (pressed, False, False))
+        grid.collision()
+
+
+def test_failed_drop_returns_unit_to_its_hex(display, monkeypatch):
+    units = pygame.sprite.Group()
+    unit = Unit(groups=[units], pos=(800, 400), name='warrior', team='blue')
+    other = Unit(groups=[units], pos=(1000, 400), name='archer', team='blue')
+    grid = make_grid(units)
+    grid.initialize_occupancy()
+    home, taken = grid.cell_of(unit), grid.cell_of(other)
+    start = unit.rect.center
+
+    drag(grid, monkeypatch, start, other.rect.center)
+
+    assert grid.cell_of(unit) == home and grid.cell_of(other) == taken
+    assert grid.occupancy[home] is unit and grid.occupancy[taken] is other
+    assert unit.rect.center == start
+    assert unit.hitbox.center == unit.rect.center
+    assert grid.selected_unit is None
+
+
+def test_nearest_hex_matches_brute_force(display):
+    grid = make_grid(pygame.sprite.Group())
+    rng = random.Random(0)
+    points = [(rng.uniform(-100, 2020), rng.uniform(-100, 1180)) for _ in range(3000)]
+    # hex centres and the points halfway between neighbours, where rounding is closest to a tie
+    points += [h.rect.center for h in grid.hexes]
+    points += [((a.rect.centerx + b.rect.centerx) / 2, (a.rect.centery + b.rect.centery) / 2)
+               for a, b in zip(grid.hexes, grid.hexes[1:])]
+    for point in points:
+        nearest = grid.find_nearest_hex_center(point)
+        # the first hex with the smallest distance, in the order of grid.hexes
+        best = min(grid.hexes, key=lambda h: math.hypot(h.rect.centerx - point[0], h.rect.centery - point[1]))
+        assert nearest['hex'] is best
+        assert nearest['dist'] == math.hypot(best.rect.centerx - point[0], best.rect.centery - point[1])
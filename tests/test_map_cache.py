@@ -0,0 +1,117 @@
+import os
+
+import pygame
+import pytest
+
+from autochess.game import map_cache
+
+TMX = '''<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.10" orientation="orthogonal" renderorder="right-down" width="2" height="2"
+     tilewidth="16" tileheight="16" infinite="0" nextlayerid="2" nextobjectid="1">
+ <tileset firstgid="1" name="tiles" tilewidth="16" tileheight="16" tilecount="2" columns="2">
+  <image source="tiles.png" width="32" height="16"/>
+ </tileset>
+ <layer id="1" name="Area" width="2" height="2">
+  <data encoding="csv">1,2,2,0</data>
+ </layer>
+</map>
+'''
+
+
+def save_tiles(path, color, width=32):
+    surf = pygame.Surface((width, 16), pygame.SRCALPHA)
+    surf.fill(color)
+    pygame.image.save(surf, path)
+
+
+@pytest.fixture
+def tmx_map(tmp_path, monkeypatch, display):
+    """A tiny map in tmp_path with its cache in tmp_path/cache; returns (tmx path, compile counter)."""
+    save_tiles(tmp_path / 'tiles.png', (200, 40, 40, 255))
+    tmx_path = tmp_path / 'map.tmx'
+    tmx_path.write_text(TMX, encoding='utf-8')
+    monkeypatch.setattr(map_cache, 'MAP_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(map_cache, 'SHEET_LAYERS', {})
+    monkeypatch.setattr(map_cache, '_loaded_maps', {})
+    compiles = []
+    compile_map = map_cache.compile_map
+
+    def counting_compile(path):
+        compiles.append(path)
+        return compile_map(path)
+
+    monkeypatch.setattr(map_cache, 'compile_map', counting_compile)
+    return str(tmx_path), compiles
+
+
+def load(tmx_path):
+    # a new process: nothing memoized, only the file on disk
+    map_cache._loaded_maps.clear()
+    return map_cache.load_map(tmx_path)
+
+
+def layout(loaded):
+    return [(layer, pos, pygame.image.tobytes(surf, 'RGBA')) for layer, surf, pos in loaded['static']]
+
+
+def test_warm_load_reads_cache(tmx_map):
+    tmx_path, compiles = tmx_map
+    assert not map_cache.is_fresh(tmx_path)
+    cold = load(tmx_path)
+    assert map_cache.is_fresh(tmx_path)
+    warm = load(tmx_path)
+    assert len(compiles) == 1
+    assert warm['tile_size'] == (16, 16)
+    assert layout(warm) == layout(cold)
+    assert [pos for _, _, pos in cold['static']] == [(0, 0), (16, 0), (0, 16)]
+
+
+def test_changed_source_forces_recompile(tmx_map, tmp_path):
+    tmx_path, compiles = tmx_map
+    load(tmx_path)
+    tiles = tmp_path / 'tiles.png'
+    save_tiles(tiles, (40, 200, 40, 255), width=48)
+    st = os.stat(tiles)
+    os.utime(tiles, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not map_cache.is_fresh(tmx_path)
+    reloaded = load(tmx_path)
+    assert len(compiles) == 2
+    assert reloaded['static'][0][1].get_at((0, 0)) == (40, 200, 40, 255)
+    assert map_cache.is_fresh(tmx_path)
+
+
+def test_touched_source_forces_recompile(tmx_map):
+    tmx_path, compiles = tmx_map
+    load(tmx_path)
+    st = os.stat(tmx_path)
+    os.utime(tmx_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not map_cache.is_fresh(tmx_path)
+    load(tmx_path)
+    assert len(compiles) == 2
+
+
+@pytest.mark.parametrize('damage', ['garbage', 'magic', 'header', 'truncated', 'pickle'])
+def test_corrupt_cache_falls_back_to_recompile(tmx_map, damage):
+    tmx_path, compiles = tmx_map
+    expected = layout(load(tmx_path))
+    path = map_cache._cache_path(tmx_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if damage == 'garbage':
+        data = os.urandom(len(data))
+    elif damage == 'magic':
+        data = b'XXXX' + data[4:]
+    elif damage == 'header':
+        data = data[:8] + b'{' * 16 + data[24:]
+    elif damage == 'truncated':
+        data = data[:-100]
+    else:
+        # an old pickled cache (or a planted one) is never unpickled
+        data = b'\x80\x05cos\nsystem\n(S"exit 1"\ntR.'
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    assert not map_cache.is_fresh(tmx_path) or damage == 'truncated'
+    assert layout(load(tmx_path)) == expected
+    assert len(compiles) == 2
+    assert map_cache.is_fresh(tmx_path)
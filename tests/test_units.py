@@ -0,0 +1,40 @@
+import pygame
+
+from autochess.game.combat import CombatProjectile
+from autochess.game.units import UnitPool
+
+
+def test_pool_revives_released_unit_with_fresh_state(display):
+    visible, units = pygame.sprite.Group(), pygame.sprite.Group()
+    pool = UnitPool()
+    unit = pool.acquire([visible, units], (400, 300), 'archer', 'red')
+    generation = unit.generation
+    arrow = CombatProjectile((0, 0), unit, speed=1, damage=1)
+    unit.attack_cooldown = 5
+    unit.status = 'Run'
+    unit.take_damage(unit.max_hp + 3)
+    assert not unit.alive and not unit.groups()
+
+    pool.release(unit)
+    revived = pool.acquire([visible, units], (900, 500), 'archer', 'red')
+
+    assert revived is unit
+    assert revived.alive and revived.hp == revived.max_hp
+    assert revived.generation == generation + 1
+    assert revived.status == 'Idle' and revived.attack_cooldown == 0 and revived.damage_taken == 0
+    assert revived.rect.center == (900, 500) and (revived.cx, revived.cy) == (900, 500)
+    assert revived.hitbox.center == revived.rect.center
+    assert revived.hitbox.width < revived.rect.width
+    assert set(revived.groups()) == {visible, units}
+    # a shot at the previous incarnation is dropped instead of hitting the revived unit
+    arrow.update()
+    assert arrow.done and revived.hp == revived.max_hp
+
+
+def test_pool_keeps_types_apart(display):
+    pool = UnitPool()
+    unit = pool.acquire([], (400, 300), 'archer', 'red')
+    pool.release(unit)
+    assert pool.acquire([], (400, 300), 'archer', 'blue') is not unit
+    assert pool.acquire([], (400, 300), 'warrior', 'red') is not unit
+    assert pool.acquire([], (400, 300), 'archer', 'red') is unit